@@ -0,0 +1,278 @@
+"""
+Benchmarks of the overhead of Patch over plain NEURON. Every benchmark times an
+operation through Patch and the equivalent code on ``neuron.h``, and the results are
+written as JSON so that they can be compared between releases::
+
+  python benchmarks/run.py -o results.json
+  mpiexec -n 4 python benchmarks/run.py -o results.json
+  python benchmarks/run.py --compare results.json
+
+Under MPI every node runs the benchmarks, and the slowest node is reported. The model
+built by each benchmark is torn down before the next one runs.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import pickle
+import platform
+import sys
+import time
+
+try:
+    # Import mpi4py before NEURON, so that they share MPI.
+    # noinspection PyPackageRequirements
+    import mpi4py.MPI
+except ImportError:
+    pass
+
+import neuron
+from neuron import h
+
+import patch
+from patch import p
+
+BENCHMARKS = {}
+# NEURON objects that must outlive their benchmark's setup, until its teardown.
+_alive = []
+
+
+def benchmark(number):
+    """
+    Register a benchmark that is called ``number`` times per repeat. The decorated
+    function sets up the benchmark and returns a Patch and a NEURON callable.
+    """
+
+    def decorator(f):
+        BENCHMARKS[f.__name__] = (f, number)
+        return f
+
+    return decorator
+
+
+def _section():
+    hs = h.Section()
+    _alive.append(hs)
+    return p.Section(), hs
+
+
+@benchmark(number=1000)
+def section_creation():
+    return p.Section, h.Section
+
+
+@benchmark(number=10000)
+def segment_wrapping():
+    s, hs = _section()
+    return lambda: s(0.5), lambda: hs(0.5)
+
+
+@benchmark(number=1000)
+def netcon():
+    s, hs = _section()
+    syn, hsyn = p.ExpSyn(s(0.5)), h.ExpSyn(hs(0.5))
+    stim, hstim = p.NetStim(), h.NetStim()
+    keep = []
+
+    def raw():
+        keep.append(h.NetCon(hstim, hsyn))
+
+    return lambda: p.NetCon(stim, syn), raw
+
+
+@benchmark(number=1000)
+def parallel_con():
+    s, hs = _section()
+    pc = h.ParallelContext()
+    offset = 10_000_000 * (1 + pc.id())
+    gids = itertools.count(offset)
+    raw_gids = itertools.count(offset + 5_000_000)
+    keep = []
+
+    def raw():
+        gid = next(raw_gids)
+        nc = h.NetCon(hs(0.5)._ref_v, None, sec=hs)
+        pc.set_gid2node(gid, pc.id())
+        pc.cell(gid, nc)
+        pc.outputcell(gid)
+        nc.threshold = -20
+        keep.append(nc)
+
+    return lambda: p.ParallelCon(s, next(gids)), raw
+
+
+@benchmark(number=1000)
+def vector_record():
+    s, hs = _section()
+    return lambda: p.Vector().record(s(0.5)), lambda: h.Vector().record(hs(0.5)._ref_v)
+
+
+@benchmark(number=10000)
+def pointer_attribute():
+    s, hs = _section()
+    syn, hsyn = p.ExpSyn(s(0.5)), h.ExpSyn(hs(0.5))
+    return lambda: syn.tau, lambda: hsyn.tau
+
+
+@benchmark(number=10)
+def range_set():
+    sections = []
+    for _ in range(100):
+        s, hs = _section()
+        s.nseg = hs.nseg = 100
+        s.insert("hh")
+        hs.insert("hh")
+        sections.append(s)
+    values = [0.12] * 10000
+    p.finitialize()
+    # Fill the range pointer cache outside of the timings, which measure the warm calls.
+    p.set(sections, "gnabar_hh", values)
+
+    def raw():
+        for hs in _alive[-100:]:
+            for seg in hs:
+                seg.gnabar_hh = 0.12
+
+    return lambda: p.set(sections, "gnabar_hh", values), raw
+
+
+@benchmark(number=20)
+def broadcast():
+    data = list(range(10000))
+    pc = h.ParallelContext()
+
+    def raw():
+        v = h.Vector(list(pickle.dumps(data)) if pc.id() == 0 else [])
+        pc.broadcast(v, 0)
+        return pickle.loads(bytes([int(d) for d in v]))
+
+    return lambda: p.parallel.broadcast(data), raw
+
+
+@benchmark(number=5)
+def run():
+    s = p.Section()
+    s.insert("hh")
+    s.iclamp(amplitude=0.3, duration=100)
+    s.record()
+    pc = h.ParallelContext()
+
+    def raw():
+        pc.set_maxstep(10)
+        h.finitialize()
+        pc.psolve(100)
+
+    return lambda: p.run(100), raw
+
+
+def teardown():
+    """
+    Delete the model built by a benchmark, so that it doesn't slow down the next ones.
+    The benchmark's callables must be released first.
+    """
+    _alive.clear()
+    gc.collect()
+    leftover = sum(1 for _ in h.allsec())
+    if leftover > 1:
+        # Only the section that records `p.time` may be left.
+        print(f"Warning: {leftover} sections left after teardown.", file=sys.stderr)
+
+
+def time_calls(f, number, repeat):
+    """
+    Return the fastest time per call of ``f`` over ``repeat`` repeats.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            f()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_benchmarks(names, repeat):
+    results = {}
+    for name in names:
+        setup, number = BENCHMARKS[name]
+        patch_call, neuron_call = setup()
+        patch_time = time_calls(patch_call, number, repeat)
+        neuron_time = time_calls(neuron_call, number, repeat)
+        results[name] = {"patch": patch_time, "neuron": neuron_time}
+        del patch_call, neuron_call
+        teardown()
+    # Report the slowest node.
+    nodes = p.parallel.py_allgather(results)
+    for name, result in results.items():
+        for key in ("patch", "neuron"):
+            result[key] = max(node[name][key] for node in nodes)
+        result["overhead"] = result["patch"] / result["neuron"]
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return the benchmarks whose overhead grew by more than ``tolerance`` (relative).
+    """
+    regressions = {}
+    for name, result in results.items():
+        if name in baseline and (
+            result["overhead"] > baseline[name]["overhead"] * (1 + tolerance)
+        ):
+            regressions[name] = (baseline[name]["overhead"], result["overhead"])
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("names", nargs="*", help="Benchmarks to run, defaults to all.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--compare", help="JSON results to compare against.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative growth of the overhead before failing the comparison.",
+    )
+    args = parser.parse_args(argv)
+    names = args.names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = run_benchmarks(names, args.repeat)
+    if p.parallel.id() != 0:
+        return 0
+    report = {
+        "meta": {
+            "patch": patch.__version__,
+            "neuron": neuron.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "nhost": int(p.parallel.nhost()),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    for name, result in results.items():
+        print(
+            f"{name:<20} patch {result['patch'] * 1e6:10.2f}us"
+            f"  neuron {result['neuron'] * 1e6:10.2f}us"
+            f"  overhead {result['overhead']:6.2f}x"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, (old, new) in regressions.items():
+            print(f"Regression in {name}: overhead {old:.2f}x -> {new:.2f}x")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,6 +26,8 @@ from .core import (
 )
 from .exceptions import NotConnectableError, NotConnectedError
 from .interpreter import PythonHocInterpreter
+from .objects import _lookup_connection
+from .sweeping import output, sweep
 
 __version__ = "4.0.0"
 p: "PythonHocInterpreter"
@@ -60,6 +62,6 @@ def connection(source, target, strict=True):
     reverse = source in target._connections
     if target not in source._connections:
         if reverse and not strict:
-            return target._connections[source]
+            return _lookup_connection(target, source)
         raise NotConnectedError("Source is not connected to target.")
-    return source._connections[target]
+    return _lookup_connection(source, target)
@@ -0,0 +1,182 @@
+"""
+On-disk catalog of the pointer-capable parameters of each HOC type, so that
+:class:`~.objects.WrapsPointers` objects don't have to introspect NEURON in every
+process. A catalog file is kept for each set of loaded mechanisms.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def get_cache_path():
+    """
+    Return the directory in which Patch stores its cache files. Can be set with the
+    ``PATCH_CACHE_DIR`` environment variable.
+    """
+    if "PATCH_CACHE_DIR" in os.environ:
+        return Path(os.environ["PATCH_CACHE_DIR"])
+    cache_home = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(cache_home) / "patch"
+
+
+class MechanismCatalog:
+    """
+    Catalog of the pointer-capable parameters of each HOC type. The catalog is keyed by
+    the NEURON version, the names of all loaded mechanisms, and the identity (path, size
+    and modification time) of each mechanism library loaded with
+    :meth:`~.interpreter.PythonHocInterpreter.nrn_load_dll`, so that projects with
+    different mechanisms don't share a catalog, and it is invalidated when a library is
+    rebuilt. The key is computed on first use, and again after every :meth:`add_library`.
+
+    New entries are kept in memory, and written to disk by :meth:`flush`, which is
+    called at exit.
+    """
+
+    def __init__(self, path=None):
+        self._path = Path(path) if path is not None else None
+        self._libraries = []
+        self._key = None
+        self._entries = None
+        self._entries_path = None
+        self._location = None
+        self._dirty = False
+        self._flush_at_exit = False
+
+    @property
+    def key(self):
+        """
+        Hash that identifies the set of loaded mechanisms.
+        """
+        if self._key is None:
+            import neuron
+
+            identity = json.dumps([neuron.__version__, _mechanisms(), self._libraries])
+            self._key = hashlib.sha256(identity.encode()).hexdigest()[:16]
+        return self._key
+
+    @property
+    def path(self):
+        """
+        Path of the catalog file for the currently loaded mechanisms.
+        """
+        directory = self._path if self._path is not None else get_cache_path()
+        return directory / f"catalog_{self.key}.json"
+
+    def add_library(self, path):
+        """
+        Register a loaded mechanism library, which switches to the catalog of the new set
+        of loaded mechanisms.
+        """
+        path = os.path.realpath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            identity = [path, None, None]
+        else:
+            identity = [path, stat.st_size, stat.st_mtime_ns]
+        if identity not in self._libraries:
+            self.flush()
+            self._libraries.append(identity)
+            self._key = None
+
+    def get(self, hoctype):
+        """
+        Get the cataloged parameters of a HOC type, or ``None`` if it is unknown.
+        """
+        return self._load().get(hoctype)
+
+    def add(self, hoctype, params):
+        """
+        Add the parameters of a HOC type to the catalog, and store it on disk.
+        """
+        self._load()[hoctype] = list(params)
+        self._dirty = True
+        if not self._flush_at_exit:
+            atexit.register(self.flush)
+            self._flush_at_exit = True
+
+    def flush(self):
+        """
+        Write the entries added in this process to disk.
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Merge with entries stored by other processes in the meantime.
+        path = self._entries_path
+        entries = self._entries
+        entries.update({k: v for k, v in self._read(path).items() if k not in entries})
+        self._write(path, entries)
+
+    def _load(self):
+        # The cache directory can change, so check that the entries are current. Only
+        # compare what determines the path, building it is slow.
+        location = (
+            self.key,
+            os.environ.get("PATCH_CACHE_DIR"),
+            os.environ.get("XDG_CACHE_HOME"),
+        )
+        if self._entries is None or self._location != location:
+            self.flush()
+            self._entries_path = self.path
+            self._entries = self._read(self._entries_path)
+            self._location = location
+        return self._entries
+
+    def _read(self, path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, path, entries):
+        # Write to a temporary file and move it in place, so that concurrent processes
+        # never read a partially written catalog. Failures (e.g. read-only file
+        # systems) only cost us the cache.
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            # `mkstemp` creates private files, give the catalog the default permissions.
+            os.chmod(tmp, 0o666 & ~_umask())
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def _mechanisms():
+    """
+    Names of all loaded density mechanisms and point processes.
+    """
+    from neuron import h
+
+    names = []
+    name = h.ref("")
+    for point_processes in (0, 1):
+        mechanism_type = h.MechanismType(point_processes)
+        for i in range(int(mechanism_type.count())):
+            mechanism_type.select(i)
+            mechanism_type.selected(name)
+            names.append(name[0])
+    return names
+
+
+def _umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+catalog = MechanismCatalog()
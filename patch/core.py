@@ -48,6 +48,43 @@ def transform_arc(obj, *args, **kwargs):
         return transform(obj)
 
 
+_change_counters = None
+
+
+def morphology_version():
+    """
+    Return a key that changes whenever NEURON processes a change to the structure or the
+    geometry of the model, or ``None`` while NEURON has changes pending that it hasn't
+    processed yet (e.g. until the next ``finitialize``).
+    """
+    global _change_counters
+
+    if _change_counters is None:
+        import ctypes
+
+        import neuron
+
+        try:
+            _change_counters = tuple(
+                neuron.nrn_dll_sym(name, ctypes.c_int)
+                for name in (
+                    "structure_change_cnt",
+                    "diam_change_cnt",
+                    "v_structure_change",
+                    "diam_changed",
+                )
+            )
+        except Exception:  # pragma: nocover
+            # Without access to the counters nothing can be cached.
+            _change_counters = ()
+    if not _change_counters:  # pragma: nocover
+        return None
+    structure, diam, structure_pending, diam_pending = _change_counters
+    if structure_pending.value or diam_pending.value:
+        return None
+    return (structure.value, diam.value)
+
+
 def _is_sequence(obj):
     t = type(obj)
     return hasattr(t, "__len__") and hasattr(t, "__getitem__")
@@ -109,7 +146,8 @@ def is_point_process(obj: Union[str, "HocObject"]):
             obj = getattr(h, obj)
     except Exception:
         return False
-    return all(k in dir(obj) for k in ["get_loc", "has_loc", "loc", "get_segment"])
+    attrs = dir(obj)
+    return all(k in attrs for k in ["get_loc", "has_loc", "loc", "get_segment"])
 
 
 def is_density_mechanism(obj: Union[str, "HocObject"]):
@@ -12,15 +12,20 @@ from patch.exceptions import (
     PatchError,
 )
 
+_devnull = None
+
 
 @contextmanager
 def _suppress_nrn(stream=None, close=False):
     """
     Makes NEURON (mostly) shut the fuck up.
     """
+    global _devnull
+
     if stream is None:
-        stream = open(os.devnull, "w")
-        close = True
+        if _devnull is None or _devnull.closed:
+            _devnull = open(os.devnull, "w")
+        stream = _devnull
     old_stdout = sys.stdout
     old_stderr = sys.stderr
     sys.stdout = stream
@@ -34,24 +39,125 @@ def _suppress_nrn(stream=None, close=False):
         sys.stderr = old_stderr
 
 
+# Output captured outside of error scopes. Reused and truncated after every capture.
+_buffer = io.StringIO()
+# The active error scope, if any.
+_scope = None
+
+
+class _ErrorScope:
+    """
+    Capture shared by all HOC error catching inside of an :func:`error_scope`. The
+    standard streams are replaced once for the whole scope, and only capture output while
+    a ``catch_hoc_error`` context is active.
+    """
+
+    def __init__(self, stdout, stderr):
+        self.buffer = io.StringIO()
+        self.depth = 0
+        self.stdout = _ScopeStream(self, stdout)
+        self.stderr = _ScopeStream(self, stderr)
+
+
+class _ScopeStream:
+    def __init__(self, scope, stream):
+        self._scope = scope
+        self._stream = stream
+
+    def write(self, s):
+        if self._scope.depth:
+            return self._scope.buffer.write(s)
+        return self._stream.write(s)
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
+
 @contextmanager
-def catch_hoc_error(*args, **context):
-    with io.StringIO() as error_stream:
-        try:
-            with _suppress_nrn(error_stream):
-                yield
-        except RuntimeError as e:
-            error = error_stream.getvalue()
+def error_scope():
+    """
+    Share the capture of NEURON's output between all the operations in this context, so
+    that bulk build code doesn't pay for swapping the standard streams on every call.
+    Output of your own code in the scope is passed through as usual.
+    """
+    global _scope
+
+    if _scope is not None:
+        # Nested scopes join the outer scope.
+        yield
+        return
+    old_stdout = sys.stdout
+    old_stderr = sys.stderr
+    scope = _ErrorScope(old_stdout, old_stderr)
+    sys.stdout = scope.stdout
+    sys.stderr = scope.stderr
+    _scope = scope
+    try:
+        yield
+    finally:
+        _scope = None
+        sys.stdout = old_stdout
+        sys.stderr = old_stderr
+
+
+class _HocErrorCatcher:
+    __slots__ = ("handlers", "context", "scope", "start", "old_streams")
+
+    def __init__(self, handlers, context):
+        self.handlers = handlers
+        self.context = context
+
+    def __enter__(self):
+        scope = self.scope = _scope
+        if scope is not None:
+            scope.depth += 1
+            self.start = scope.buffer.tell()
+        else:
+            self.old_streams = (sys.stdout, sys.stderr)
+            sys.stdout = sys.stderr = _buffer
+            self.start = _buffer.tell()
+        return self.context
+
+    def __exit__(self, exc_type, exc, tb):
+        scope = self.scope
+        if scope is not None:
+            scope.depth -= 1
+            buffer = scope.buffer
+        else:
+            sys.stdout, sys.stderr = self.old_streams
+            buffer = _buffer
+        if exc_type is not None and issubclass(exc_type, RuntimeError):
+            error = buffer.getvalue()[self.start :]
+        else:
+            error = None
+        # Discard the captured output.
+        buffer.seek(self.start)
+        buffer.truncate()
+        if error is not None:
             try:
-                for handler in args:
-                    handler(error, context)
+                for handler in self.handlers:
+                    handler(error, self.context)
             except Exception as e:
                 raise e from None
             # Uncaught HocError
-            if "hoc error" in str(e) or "hocobj_call error" in str(e):
+            if "hoc error" in str(exc) or "hocobj_call error" in str(exc):
                 raise HocError(error) from None
             # Actual RuntimeError
-            raise e from None  # pragma: nocover
+            raise exc from None  # pragma: nocover
+        return False
+
+
+def catch_hoc_error(*args, **context):
+    """
+    Capture the output of NEURON and translate any HOC errors that occur in the context
+    using the given error handlers.
+
+    The context dictionary is yielded, so that bulk operations can update the error
+    context as they go, and report the arguments of the call that actually failed.
+    Inside of an :func:`error_scope` no streams are swapped, and the captured output is
+    only read when an error occurs.
+    """
+    return _HocErrorCatcher(args, context)
 
 
 class ErrorHandler:
@@ -0,0 +1,195 @@
+"""
+Opt-in instrumentation of the hot paths of Patch. While enabled, the hot paths are
+replaced by wrappers that count calls and accumulate wall time per call site. Disabling
+restores the original functions, so that instrumentation costs nothing when it isn't
+used::
+
+  from patch import instrumentation
+
+  instrumentation.enable()
+  build_my_model()
+  instrumentation.disable()
+  for row in instrumentation.report():
+      print(row)
+
+Times are inclusive: the time spent in ``transform`` during a ``p.NetCon`` call counts
+towards both.
+"""
+
+import functools
+import sys
+import time
+
+# Accumulated [calls, seconds] per (hot path, call site).
+_stats = {}
+# Replaced attributes as (owner, name, original).
+_patches = []
+
+
+def is_enabled():
+    """
+    Return whether the instrumentation is enabled.
+    """
+    return bool(_patches)
+
+
+def enable():
+    """
+    Start counting calls and accumulating wall time of the hot paths of Patch:
+    ``transform``, ``catch_hoc_error``, the introspection of ``WrapsPointers``,
+    ``__ref__`` and each factory of the ``PythonHocInterpreter``.
+    """
+    if is_enabled():
+        return
+    from . import core, error_handler, interpreter, objects
+
+    for name, original, replacement in (
+        ("transform", core.transform, _timed("transform", core.transform)),
+        (
+            "catch_hoc_error",
+            error_handler.catch_hoc_error,
+            _timed_catcher(error_handler.catch_hoc_error),
+        ),
+    ):
+        # Replace the function in every module that imported it.
+        for module in list(sys.modules.values()):
+            module_name = getattr(module, "__name__", "")
+            if module_name == "patch" or module_name.startswith("patch."):
+                if getattr(module, name, None) is original:
+                    _patch(module, name, replacement)
+    _patch_method(objects.WrapsPointers, "_init_pointers_wrappers")
+    _patch_method(objects.PythonHocObject, "__ref__")
+    _patch_method(interpreter._VectorFactory, "__call__", "PythonHocInterpreter.Vector")
+    for name, attr in list(vars(interpreter.PythonHocInterpreter).items()):
+        if name[0].isupper() and callable(attr):
+            _patch_method(interpreter.PythonHocInterpreter, name)
+    _patch_point_process_wrapping(interpreter.PythonHocInterpreter)
+
+
+def disable():
+    """
+    Stop the instrumentation and restore the original functions. The gathered
+    statistics are kept until :func:`reset`.
+    """
+    while _patches:
+        owner, name, original = _patches.pop()
+        setattr(owner, name, original)
+
+
+def reset():
+    """
+    Clear the gathered statistics.
+    """
+    _stats.clear()
+
+
+def report(by_call_site=True):
+    """
+    Return the gathered statistics, slowest first.
+
+    :param by_call_site: Report each call site of a hot path separately. Otherwise
+      report the totals per hot path.
+    :returns: A row for each hot path (and call site), with the keys ``name``,
+      ``call_site``, ``calls``, ``time`` and ``mean`` (in seconds).
+    :rtype: List[dict]
+    """
+    totals = {}
+    for (name, call_site), (calls, seconds) in _stats.items():
+        key = (name, call_site if by_call_site else None)
+        total = totals.setdefault(key, [0, 0.0])
+        total[0] += calls
+        total[1] += seconds
+    rows = [
+        {
+            "name": name,
+            "call_site": call_site,
+            "calls": calls,
+            "time": seconds,
+            "mean": seconds / calls if calls else 0.0,
+        }
+        for (name, call_site), (calls, seconds) in totals.items()
+    ]
+    return sorted(rows, key=lambda row: row["time"], reverse=True)
+
+
+def _patch(owner, name, replacement):
+    # Store the raw attribute, so that classmethods are restored as classmethods.
+    _patches.append((owner, name, vars(owner)[name]))
+    setattr(owner, name, replacement)
+
+
+def _patch_point_process_wrapping(cls):
+    # Point processes are wrapped on first access, so time the ones wrapped from now on.
+    wrap = cls._wrap_point_process
+
+    def timed_wrap(cls, name):
+        factory = wrap(name)
+        # Restore the untimed factory when the instrumentation is disabled.
+        _patches.insert(0, (cls, name, factory))
+        return _timed(f"{cls.__name__}.{name}", factory)
+
+    _patch(cls, "_wrap_point_process", classmethod(timed_wrap))
+
+
+def _patch_method(cls, name, label=None):
+    _patch(cls, name, _timed(label or f"{cls.__name__}.{name}", vars(cls)[name]))
+
+
+def _call_site(frame):
+    return f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+
+
+def _record(name, call_site, seconds, calls=1):
+    try:
+        stat = _stats[(name, call_site)]
+    except KeyError:
+        stat = _stats[(name, call_site)] = [0, 0.0]
+    stat[0] += calls
+    stat[1] += seconds
+
+
+def _timed(name, f):
+    @functools.wraps(f)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            _record(name, _call_site(sys._getframe(1)), time.perf_counter() - start)
+
+    return timed
+
+
+def _timed_catcher(f):
+    @functools.wraps(f)
+    def timed(*args, **kwargs):
+        return _TimedCatcher(f(*args, **kwargs), _call_site(sys._getframe(1)))
+
+    return timed
+
+
+class _TimedCatcher:
+    """
+    Times the entry and exit of a ``catch_hoc_error`` context, but not its body.
+    """
+
+    __slots__ = ("_catcher", "_call_site")
+
+    def __init__(self, catcher, call_site):
+        self._catcher = catcher
+        self._call_site = call_site
+
+    def __enter__(self):
+        start = time.perf_counter()
+        try:
+            return self._catcher.__enter__()
+        finally:
+            _record("catch_hoc_error", self._call_site, time.perf_counter() - start)
+
+    def __exit__(self, *exc_info):
+        start = time.perf_counter()
+        try:
+            return self._catcher.__exit__(*exc_info)
+        finally:
+            seconds = time.perf_counter() - start
+            _record("catch_hoc_error", self._call_site, seconds, calls=0)
@@ -1,22 +1,32 @@
+import math
 import typing
 import warnings
-from functools import cache, wraps
+import weakref
+from functools import cached_property, wraps
 
 # We don't need to reraise ImportErrors, they should be clear enough by themselves. If not
 # and you're reading this: Fix the NEURON install, it's currently not importable ;)
 import neuron as _nrn
 from neuron import h as _h
 
+from .catalog import catalog
 from .core import (
+    _is_sequence,
     assert_connectable,
     is_nrn_scalar,
     is_point_process,
     is_section,
     is_segment,
+    morphology_version,
     transform,
     transform_netcon,
 )
-from .error_handler import CatchNetCon, CatchSectionAccess, catch_hoc_error
+from .error_handler import (
+    CatchNetCon,
+    CatchSectionAccess,
+    catch_hoc_error,
+    error_scope,
+)
 from .exceptions import (
     BroadcastError,
     HocSectionAccessError,
@@ -24,18 +34,28 @@ from .exceptions import (
     UninitializedError,
 )
 from .objects import (
+    Geometry,
     IClamp,
     NetCon,
+    NetConCollection,
     PointProcess,
     PythonHocObject,
     SEClamp,
     Section,
     SectionRef,
+    Snapshot,
     VecStim,
+    VecStimCollection,
     Vector,
+    Waveform,
+    _broadcast_values,
+    _CollectionConnection,
     _get_obj_registration_queue,
+    _read_geometry,
     _safe_call,
+    _set_3d_points,
 )
+from .traces import TraceSink
 
 _nrnver = _nrn.version
 try:
@@ -51,17 +71,62 @@ except Exception:  # pragma: nocover
 
 
 ParallelContextType: "ParallelContext"
+# Maximum amount of bytes transmitted per broadcast call, a multiple of 6.
+_BROADCAST_CHUNK = 6 * 2**20
+
+
+def _as_sections(sections):
+    return [sections] if is_section(sections) else list(sections)
+
+
+def _check_range_variable(segments, name):
+    segments = list(segments)
+    if segments and not any(hasattr(seg, name) for seg in segments):
+        raise AttributeError(f"No segment has a range variable '{name}'.")
+
+
+def _iter_segments(sections):
+    for section in _as_sections(sections):
+        yield from transform(section)
+
+
+class _VectorFactory:
+    """
+    Creates :class:`~.objects.Vector` objects on the interpreter. Calling it works like
+    ``h.Vector``, and it provides :meth:`from_numpy` to bulk fill Vectors from arrays.
+    """
+
+    def __init__(self, interpreter):
+        self._interpreter = interpreter
+
+    def __call__(self, *args, **kwargs):
+        import numpy
+
+        if len(args) == 1 and not kwargs and isinstance(args[0], numpy.ndarray):
+            return self.from_numpy(args[0])
+        return Vector(self._interpreter, _h.Vector(*args, **kwargs))
 
+    def from_numpy(self, arr):
+        """
+        Create a Vector and fill it with the data of an array in bulk.
+
+        :param arr: Array, or any sequence that NumPy can convert to a float array.
+        :type arr: numpy.ndarray
+        :rtype: :class:`~.objects.Vector`
+        """
+        import numpy
 
-class TimeSingleton(Vector):
-    @cache
-    def __new__(cls, *args, **kwargs):
-        return super().__new__(cls)
+        arr = numpy.asarray(arr, dtype=float).ravel()
+        ptr = _h.Vector(len(arr))
+        if len(arr):
+            ptr.as_numpy()[:] = arr
+        return Vector(self._interpreter, ptr)
 
 
 class PythonHocInterpreter:
     __pc: "ParallelContextType"
-    __point_processes = []
+    # Whether each name on `h` that was looked up is a point process.
+    __point_processes = {}
     __h = _h
 
     def __init__(self):
@@ -69,6 +134,20 @@ class PythonHocInterpreter:
         self.load_file("stdrun.hoc")
         self.celsius = 32
         self._finitialized: bool = False
+        self._geometry_cache = {}
+        self._geometry_version = None
+        self._range_cache = {}
+        self._range_version = None
+        self._state_index = None
+        self._waveforms = weakref.WeakValueDictionary()
+        self._recordings = weakref.WeakSet()
+        # Vectors of recorded spikes or events, e.g. from `NetCon.record`.
+        self._event_recordings = weakref.WeakSet()
+        self._chunk_hooks = {}
+        self._time = None
+        self.__dud_section = None
+        self.__time_section = None
+        self._sample_times = {}
 
     @classmethod
     def _process_registration_queue(cls):
@@ -110,6 +189,11 @@ class PythonHocInterpreter:
             setattr(interpreter_class, hoc_object_class.__name__, wrapper)
 
     def __getattr__(self, attr_name):
+        cls = type(self)
+        if cls._is_point_process(attr_name):
+            # Wrap point processes on first access.
+            setattr(cls, attr_name, cls._wrap_point_process(attr_name))
+            return getattr(self, attr_name)
         # Get the missing attribute from h
         return getattr(self.__h, attr_name)
 
@@ -121,9 +205,18 @@ class PythonHocInterpreter:
 
     def nrn_load_dll(self, path):
         result = self.__h.nrn_load_dll(path)
-        self.__class__._wrap_point_processes()
+        if result:
+            catalog.add_library(path)
+        # Names that weren't point processes might be defined by the new library.
+        point_processes = type(self).__point_processes
+        for name in [k for k, v in point_processes.items() if not v]:
+            del point_processes[name]
         return result
 
+    @cached_property
+    def Vector(self) -> _VectorFactory:
+        return _VectorFactory(self)
+
     def NetCon(self, source, target, *args, **kwargs):
         nrn_source = transform_netcon(source)
         nrn_target = transform_netcon(target)
@@ -182,6 +275,112 @@ class PythonHocInterpreter:
 
         return connection
 
+    def NetCons(
+        self,
+        sources,
+        targets,
+        *,
+        weight=0.1,
+        delay=1,
+        threshold=-20,
+    ) -> NetConCollection:
+        """
+        Create many NetCons in a single pass. ``sources`` and ``targets`` are sequences
+        of equal length, or a single object that is connected to every item of the other
+        sequence. ``targets`` can be ``None`` to create spike detectors.
+
+        Every distinct source and target is only classified and transformed once per
+        batch, and NEURON's error output is captured once for the whole batch. Like
+        :meth:`NetCon`, the NetCons are registered as the connection between their source
+        and target, but their wrappers are only created when looked up with
+        :func:`patch.connection`.
+
+        :param weight: Scalar, array with one weight per NetCon, or 2D array with
+          multiple weights per NetCon.
+        :param delay: Scalar or array with one delay per NetCon.
+        :param threshold: Scalar or array with one threshold per NetCon.
+        :returns: A collection with strong references to all sources and targets.
+        :rtype: :class:`~.objects.NetConCollection`
+        """
+        n = None
+        if _is_sequence(sources):
+            n = len(sources)
+        if targets is not None and _is_sequence(targets):
+            if n is not None and n != len(targets):
+                raise ValueError(
+                    f"Got {n} sources but {len(targets)} targets, lengths must match."
+                )
+            n = len(targets)
+        if n is None:
+            raise TypeError("Either the sources or targets must be a sequence.")
+        # Items are memoized by id, so sequences that create them on access (like
+        # collections) must be kept alive for the whole batch.
+        sources = list(sources) if _is_sequence(sources) else [sources] * n
+        if targets is None or not _is_sequence(targets):
+            targets = [targets] * n
+        else:
+            targets = list(targets)
+        weights = _broadcast_values(weight, n, "weight")
+        delays = _broadcast_values(delay, n, "delay")
+        thresholds = _broadcast_values(threshold, n, "threshold")
+        unique_sources = list({id(s): s for s in sources}.values())
+        unique_targets = [
+            t for t in {id(t): t for t in targets}.values() if t is not None
+        ]
+        # Memoize the NetCon arguments of each distinct source and target.
+        source_args = {}
+        target_args = {}
+        factory = self.__h.NetCon
+        pointers = []
+        with catch_hoc_error(CatchNetCon, nrn_source=None, nrn_target=None) as context:
+            for source, target in zip(sources, targets):
+                try:
+                    nrn_source, kwargs = source_args[id(source)]
+                except KeyError:
+                    nrn_source, kwargs = source_args[id(source)] = (
+                        transform_netcon(source),
+                        self._netcon_source_kwargs(source),
+                    )
+                try:
+                    nrn_target = target_args[id(target)]
+                except KeyError:
+                    nrn_target = target_args[id(target)] = transform_netcon(target)
+                context["nrn_source"] = nrn_source
+                context["nrn_target"] = nrn_target
+                pointers.append(factory(nrn_source, nrn_target, **kwargs))
+        collection = NetConCollection(self, pointers, unique_sources, unique_targets)
+        collection.weight = weights
+        collection.delay = delays
+        collection.threshold = thresholds
+        # Connect sources and targets, like `NetCon` does.
+        if unique_targets:
+            for source in unique_sources:
+                assert_connectable(source, label="Source")
+            for target in unique_targets:
+                assert_connectable(target, label="Target")
+            # The NetCon wrappers are only created when asked for, see `connection`.
+            for i, (source, target) in enumerate(zip(sources, targets)):
+                connection = _CollectionConnection(collection, i)
+                source._connections[target] = connection
+                target._connections[source] = connection
+        # Have every source and target keep the NetCons alive.
+        for obj in (*unique_sources, *unique_targets):
+            if hasattr(obj, "__ref__"):
+                obj.__ref__(collection)
+        return collection
+
+    def _netcon_source_kwargs(self, source):
+        if is_section(source):
+            return {"sec": transform(source)}
+        elif is_segment(source):
+            return {"sec": transform(source).sec}
+        elif is_nrn_scalar(source):
+            raise ConnectionError(
+                "Using NetCon with a scalar such as s(0.5)._ref_v is discouraged. "
+                "Use s(0.5) instead."
+            )
+        return {}
+
     def ParallelCon(self, a, b, output=True, *args, **kwargs):
         a_int = isinstance(a, int)
         b_int = isinstance(b, int)
@@ -210,6 +409,257 @@ class PythonHocInterpreter:
                 "Either the first or second argument has to be an integer GID."
             )
 
+    def build_morphology(self, points, diameters, section_index, parent_index):
+        """
+        Create all the sections of a morphology, add their 3D points and connect them, in
+        bulk.
+
+        :param points: Array of shape ``(N, 3)`` with the 3D points of all sections. The
+          points of each section must be given in order.
+        :param diameters: Scalar or array of shape ``(N,)`` with the diameter at each
+          point.
+        :param section_index: Array of shape ``(N,)`` with the index of the section that
+          each point belongs to.
+        :param parent_index: Array of shape ``(S,)`` with the index of the parent section
+          of each section, or -1 for root sections. The start of each child is connected
+          to the end of its parent.
+        :returns: The ``S`` created sections.
+        :rtype: List[:class:`~.objects.Section`]
+        """
+        import numpy
+
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        diameters = _broadcast_values(diameters, len(points), "diameter")
+        section_index = numpy.asarray(section_index, dtype=int)
+        parent_index = numpy.asarray(parent_index, dtype=int)
+        n = len(parent_index)
+        if len(section_index) != len(points):
+            raise ValueError(
+                f"Got {len(points)} points but {len(section_index)} section indices."
+            )
+        if len(section_index) and (section_index.min() < 0 or section_index.max() >= n):
+            raise ValueError(f"Section indices must be between 0 and {n - 1}.")
+        if len(parent_index) and (parent_index.min() < -1 or parent_index.max() >= n):
+            raise ValueError(f"Parent indices must be between -1 and {n - 1}.")
+        # Group the points per section, keeping them in order within each section.
+        order = numpy.argsort(section_index, kind="stable")
+        bounds = numpy.searchsorted(section_index[order], numpy.arange(n + 1))
+        vectors = [self.__h.Vector() for _ in range(4)]
+        sections = [self.Section() for _ in range(n)]
+        for section, start, stop in zip(sections, bounds[:-1], bounds[1:]):
+            if start != stop:
+                idx = order[start:stop]
+                _set_3d_points(
+                    self, transform(section), points[idx], diameters[idx], vectors
+                )
+        for section, parent in zip(sections, parent_index.tolist()):
+            if parent >= 0:
+                section.connect(sections[parent])
+        return sections
+
+    def geometry(self, sections):
+        """
+        Read the 3D points, diameters, arc lengths and segment midpoints of the given
+        sections into contiguous arrays.
+
+        The geometry of each section is cached until NEURON processes a change to the
+        morphology. While NEURON has unprocessed changes (e.g. before the next
+        ``finitialize``) the geometry is read anew on every call.
+
+        :param sections: Sections to read.
+        :rtype: :class:`~.objects.Geometry`
+        """
+        sections = list(sections)
+        version = morphology_version()
+        if version != self._geometry_version:
+            self._geometry_cache.clear()
+            self._geometry_version = version
+        cache = self._geometry_cache
+        parts = []
+        for section in sections:
+            nrn_section = transform(section)
+            # Python objects of HOC sections are transient and their ids get reused, but
+            # their hash identifies the NEURON section.
+            key = hash(nrn_section)
+            try:
+                part = cache[key]
+            except KeyError:
+                part = _read_geometry(nrn_section)
+                if version is not None:
+                    cache[key] = part
+            parts.append(part)
+        return Geometry(sections, parts)
+
+    def get(self, sections, name):
+        """
+        Read a range variable of every segment of the given sections into an array, in
+        the order of the sections and their segments.
+
+        The values are gathered in bulk through pointers that are cached until NEURON
+        processes a change to the model, like :meth:`geometry`.
+
+        :param sections: Section or sections to read.
+        :param name: Name of the range variable, e.g. ``"v"`` or ``"gnabar_hh"``.
+        :rtype: numpy.ndarray
+        """
+        return self._get_range(sections, name)
+
+    def set(self, sections, name, values):
+        """
+        Set a range variable of every segment of the given sections, in the order of the
+        sections and their segments.
+
+        :param sections: Section or sections to set.
+        :param name: Name of the range variable, e.g. ``"v"`` or ``"gnabar_hh"``.
+        :param values: A value for every segment, a single value for all of them, or a
+          function that is called with an array of the ``x`` of every segment and returns
+          the values.
+        :type values: Union[float, numpy.ndarray, Callable]
+        """
+        self._set_range(sections, name, values)
+
+    def state(self, names=("v",)):
+        """
+        Read the state of every segment of the model into flat arrays, in the order of
+        :meth:`state_index`. Segments without a mechanism get ``NaN`` for its variables.
+
+        :param names: Range variables to read, e.g. ``("v", "m_hh", "h_hh", "n_hh")``.
+        :returns: An array per name.
+        :rtype: Dict[str, numpy.ndarray]
+        """
+        sections = self._state_sections()
+        return {name: self._get_range(sections, name, missing=True) for name in names}
+
+    def set_state(self, state):
+        """
+        Write the state of every segment of the model, in the order of
+        :meth:`state_index`. Values of segments without the mechanism are ignored.
+
+        :param state: An array, or a single value, per range variable, like those
+          returned by :meth:`state`.
+        :type state: Dict[str, numpy.ndarray]
+        """
+        sections = self._state_sections()
+        for name, values in state.items():
+            self._set_range(sections, name, values, missing=True)
+        if self.cvode.active():
+            self.cvode.re_init()
+
+    def state_index(self):
+        """
+        Return the section and ``x`` of each position in the arrays of :meth:`state`. The
+        index is cached until NEURON processes a change to the model.
+
+        :rtype: List[Tuple[~.objects.Section, float]]
+        """
+        sections = self._state_sections()
+        version = morphology_version()
+        # Only cache the positions, so that the cache doesn't keep sections alive.
+        key = (version, tuple(map(hash, sections)))
+        if version is not None and self._state_index and self._state_index[0] == key:
+            positions = self._state_index[1]
+        else:
+            positions = [
+                (i, seg.x) for i, section in enumerate(sections) for seg in section
+            ]
+            self._state_index = (key, positions) if version is not None else None
+        wrappers = [Section(self, section) for section in sections]
+        return [(wrappers[i], x) for i, x in positions]
+
+    def _state_sections(self):
+        dud = transform(self.__dud_section) if self.__dud_section else None
+        return [s for s in self.__h.allsec() if s != dud]
+
+    def _get_range(self, sections, name, missing=False):
+        import numpy
+
+        pointers = self._range_pointers(sections, name, missing)
+        if pointers is None:
+            segments = list(_iter_segments(sections))
+            if missing:
+                _check_range_variable(segments, name)
+            default = (float("nan"),) if missing else ()
+            return numpy.fromiter(
+                (getattr(seg, name, *default) for seg in segments), dtype=float
+            )
+        ptrs, buffer, _, _ = pointers
+        ptrs.gather(buffer)
+        return buffer.as_numpy().copy()
+
+    def _set_range(self, sections, name, values, missing=False):
+        import numpy
+
+        # NEURON has to process changes to the diameter, so they can't go through pointers.
+        if name != "diam":
+            pointers = self._range_pointers(sections, name, missing)
+        else:
+            pointers = None
+        if pointers is None:
+            segments = list(_iter_segments(sections))
+            if missing:
+                _check_range_variable(segments, name)
+            if callable(values):
+                values = values(numpy.fromiter((seg.x for seg in segments), dtype=float))
+            values = numpy.broadcast_to(numpy.asarray(values, dtype=float), len(segments))
+            for seg, value in zip(segments, values.tolist()):
+                if not missing or hasattr(seg, name):
+                    setattr(seg, name, value)
+            return
+        ptrs, buffer, x, dummy = pointers
+        if callable(values):
+            values = values(x)
+        buffer.as_numpy()[:] = values
+        ptrs.scatter(buffer)
+        if dummy is not None:
+            dummy.x[0] = float("nan")
+
+    def _range_pointers(self, sections, name, missing=False):
+        # Pointers to a range variable in every segment, with a buffer to gather into, the
+        # `x` of every segment and, if the variable may be `missing`, the NaN that missing
+        # values point to. Can't be cached while changes are pending.
+        import numpy
+
+        version = morphology_version()
+        if version is None:
+            return None
+        if version != self._range_version:
+            self._range_cache.clear()
+            self._range_version = version
+        nrn_sections = [transform(section) for section in _as_sections(sections)]
+        # The Python objects of HOC sections are transient, their ids can be reused by
+        # other sections. Their hash identifies the NEURON section itself, and a NEURON
+        # section can only be replaced by a structure change, which clears the cache.
+        key = (tuple(map(hash, nrn_sections)), name, missing)
+        try:
+            return self._range_cache[key]
+        except KeyError:
+            pass
+        n = sum(section.nseg for section in nrn_sections)
+        ptrs = self.__h.PtrVector(n)
+        dummy = self.__h.Vector(1).fill(float("nan")) if missing else None
+        ref = "_ref_" + name
+        found = 0
+        i = 0
+        for section in nrn_sections:
+            for seg in section:
+                try:
+                    ptr = getattr(seg, ref)
+                except AttributeError:
+                    if not missing:
+                        raise
+                    ptr = dummy._ref_x[0]
+                else:
+                    found += 1
+                ptrs.pset(i, ptr)
+                i += 1
+        if missing and not found:
+            _check_range_variable(_iter_segments(nrn_sections), name)
+        x = numpy.concatenate(
+            [(numpy.arange(s.nseg) + 0.5) / s.nseg for s in nrn_sections] or [[]]
+        )
+        pointers = self._range_cache[key] = (ptrs, self.__h.Vector(n), x, dummy)
+        return pointers
+
     def SectionRef(self, *args, sec=None):
         if len(args) > 1:
             raise TypeError(
@@ -242,12 +692,92 @@ class PythonHocInterpreter:
         mod_name = g.resolve("VecStim")
         vec_stim = VecStim(self, getattr(self.__h, mod_name)(*args, **kwargs))
         if pattern is not None:
-            pattern_vector = self.Vector(pattern)
+            pattern_vector = self.Vector.from_numpy(pattern)
             vec_stim.play(pattern_vector.__neuron__())
-            self._vector = pattern_vector
-            self._pattern = pattern
+            vec_stim._vector = pattern_vector
+            vec_stim._pattern = pattern
         return vec_stim
 
+    def VecStims(self, spike_times, offsets) -> VecStimCollection:
+        """
+        Create a VecStim for every spike train of a population. The spike trains are
+        given in compressed sparse row form: the spike times of train ``i`` are
+        ``spike_times[offsets[i]:offsets[i + 1]]``::
+
+          trains = [[1, 5], [], [2, 3, 4]]
+          stims = p.VecStims([1, 5, 2, 3, 4], [0, 2, 2, 5])
+
+        :param spike_times: Spike times of all trains, one train after the other.
+        :type spike_times: numpy.ndarray
+        :param offsets: Index of the first spike of each train, followed by the end of the
+          last train.
+        :type offsets: numpy.ndarray
+        :returns: A collection with strong references to the VecStims and their Vectors.
+        :rtype: :class:`~.objects.VecStimCollection`
+        """
+        import glia as g
+        import numpy
+
+        spike_times = numpy.asarray(spike_times, dtype=float).ravel()
+        offsets = numpy.asarray(offsets, dtype=int).ravel()
+        if not len(offsets):
+            raise ValueError("`offsets` needs at least the end of the last train.")
+        if (
+            numpy.any(numpy.diff(offsets) < 0)
+            or offsets[0] < 0
+            or offsets[-1] > len(spike_times)
+        ):
+            raise ValueError("`offsets` must be ascending indices into `spike_times`.")
+        factory = getattr(self.__h, g.resolve("VecStim"))
+        vector_factory = self.__h.Vector
+        # Cut the Vector of each train out of a Vector with all spike times.
+        all_times = vector_factory(spike_times)
+        pointers = []
+        vectors = []
+        for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+            if stop > start:
+                vector = all_times.c(start, stop - 1)
+            else:
+                vector = vector_factory()
+            stim = factory()
+            stim.play(vector)
+            pointers.append(stim)
+            vectors.append(vector)
+        return VecStimCollection(self, pointers, vectors, spike_times, offsets)
+
+    def stimulate(
+        self, point_processes, pattern=None, weight=0.04, delay=0.0, **kwargs
+    ) -> NetConCollection:
+        """
+        Stimulate many point processes with a single shared stimulus, that is fanned out
+        with a NetCon per point process. See :meth:`.objects.PointProcess.stimulate`.
+
+        :param point_processes: The point processes to stimulate.
+        :param pattern: Specific stimulus event times to play into the point processes.
+        :type pattern: list[float]
+        :param weight: Scalar or array with one weight per point process.
+        :param delay: Scalar or array with one delay per point process.
+        :param kwargs: All keyword arguments will be set on the
+          :class:`NetStim <neuron:NetStim>`
+        :returns: The NetCons, the stimulus is their source.
+        :rtype: :class:`~.objects.NetConCollection`
+        """
+        if not _is_sequence(point_processes):
+            point_processes = [point_processes]
+        stimulus = self._stimulus(pattern, **kwargs)
+        return self.NetCons(stimulus, point_processes, weight=weight, delay=delay)
+
+    def _stimulus(self, pattern=None, **kwargs):
+        if pattern is None:
+            # No specific pattern given, create NetStim
+            stimulus = self.NetStim()
+            for kw, value in kwargs.items():
+                setattr(stimulus.__neuron__(), kw, value)
+        else:
+            # Specific pattern required, create VecStim
+            stimulus = self.VecStim(pattern=pattern)
+        return stimulus
+
     def IClamp(self, x=0.5, sec=None):
         sec = sec if sec is not None else self.cas()
         clamp = IClamp(self, self.__h.IClamp(x, sec=transform(sec)))
@@ -256,6 +786,102 @@ class PythonHocInterpreter:
             sec.__ref__(clamp)
         return clamp
 
+    def waveform(
+        self, values, sample_interval=None, *, delay=0, interpolate=False, initial=None
+    ):
+        """
+        Encode values to play into variables during the simulation, starting at ``delay``
+        ms. Waveforms with the same values and timing are cached and shared while in use.
+
+        Without interpolation, each value is held until the next, and repeated values are
+        encoded as a single step, so that piecewise constant waveforms stay compact.
+        Otherwise the values are played every ``sample_interval`` ms.
+
+        :param values: The value every ``sample_interval`` ms.
+        :type values: Union[List[float], numpy.ndarray]
+        :param sample_interval: Time between the values, defaults to ``dt``.
+        :type sample_interval: float
+        :param delay: Time of the first value.
+        :type delay: float
+        :param interpolate: Interpolate linearly between the values.
+        :type interpolate: bool
+        :param initial: Value to play from 0 until ``delay`` ms. By default the variable
+          isn't changed before ``delay``, and interpolated waveforms are then played as
+          steps every ``dt``.
+        :type initial: float
+        :rtype: :class:`~.objects.Waveform`
+        """
+        import hashlib
+
+        import numpy
+
+        values = numpy.ascontiguousarray(values, dtype=float).ravel()
+        step = sample_interval if sample_interval is not None else self.dt
+        digest = hashlib.blake2b(values.tobytes(), digest_size=16).digest()
+        key = (digest, len(values), step, delay, interpolate, initial, self.dt)
+        try:
+            return self._waveforms[key]
+        except KeyError:
+            pass
+        n = len(values)
+        duration = n * step
+        lead = initial is not None and delay > 0
+        # Only discrete plays with a time vector leave the variable alone until `delay`.
+        hold_off = initial is None and delay > 0
+        if interpolate and hold_off and n:
+            # Continuous plays set the first value from the start, so the interpolation
+            # is sampled every time step and played as steps instead.
+            times = numpy.arange(delay, delay + (n - 1) * step + self.dt / 2, self.dt)
+            values = numpy.interp(times, delay + step * numpy.arange(n), values)
+            waveform = Waveform(
+                self.Vector.from_numpy(values),
+                self.Vector.from_numpy(times),
+                None,
+                False,
+                duration,
+            )
+        elif interpolate:
+            times = delay + step * numpy.arange(n)
+            if lead:
+                # Repeating the time of the first value makes a discontinuity.
+                times = numpy.concatenate(([0, delay], times))
+                values = numpy.concatenate(([initial, initial], values))
+            waveform = Waveform(
+                self.Vector.from_numpy(values),
+                self.Vector.from_numpy(times),
+                None,
+                True,
+                duration,
+            )
+        else:
+            # Only the steps of the waveform have to be played.
+            steps = numpy.flatnonzero(values[1:] != values[:-1]) + 1
+            steps = numpy.concatenate(([0], steps)) if n else steps
+            padding = round(delay / step)
+            compact = n + padding <= 2 * len(steps)
+            if not hold_off and math.isclose(padding * step, delay) and compact:
+                # Play every value, preceded by padding to delay the start.
+                pad = initial if initial is not None else values[0] if n else 0
+                padded = numpy.concatenate((numpy.full(padding, pad), values))
+                waveform = Waveform(
+                    self.Vector.from_numpy(padded), None, step, False, duration
+                )
+            else:
+                times = delay + step * steps
+                values = values[steps]
+                if lead:
+                    times = numpy.concatenate(([0], times))
+                    values = numpy.concatenate(([initial], values))
+                waveform = Waveform(
+                    self.Vector.from_numpy(values),
+                    self.Vector.from_numpy(times),
+                    None,
+                    False,
+                    duration,
+                )
+        self._waveforms[key] = waveform
+        return waveform
+
     def SEClamp(self, sec, x=0.5):
         clamp = SEClamp(self, self.__h.SEClamp(transform(sec(x))))
         clamp.__ref__(sec)
@@ -265,18 +891,81 @@ class PythonHocInterpreter:
 
     @property
     def time(self):
+        """
+        Vector that records the simulation time. It is created on first access and shared
+        by all callers; NEURON resizes it at the start of every simulation.
+
+        :rtype: :class:`~.objects.Vector`
+        """
+        if self._time is None:
+            self._time = self.Vector()
+            self._record_time()
+        elif not self.__time_section.exists():
+            self._record_time()
+        return self._time
+
+    def _record_time(self):
         # Fix for upstream NEURON bug. See https://github.com/neuronsimulator/nrn/issues/416
-        if not any(self.allsec()):  # pragma: nocover
+        # Time is recorded alongside a section, and the recording stops when that section
+        # is deleted, so it moves to another section then. Only models without sections
+        # get a section to record the time.
+        section = next(iter(self.__h.allsec()), None)
+        if section is None:
             self.__dud_section = self.Section(name="this_is_here_to_record_time")
-        # Time vectors need to be shared, because it can only be recorded into 1
-        # target, but should also update every time they are accessed, to resize them
-        # between simulation sessions
-        time_singleton = TimeSingleton(self, self.__h.Vector().record(self._ref_t))
-        return time_singleton
+            section = transform(self.__dud_section)
+        self.__time_section = self.__h.SectionRef(sec=section)
+        self._time.record(self._ref_t, sec=section)
+
+    def sample_times(self, interval=None, start=None, stop=None):
+        """
+        Return the sample times of recordings made with the same sampling options as
+        :meth:`.objects.Vector.record`. When the samples fall on time steps this is a view
+        on the data of :attr:`time`, otherwise the times are computed once per simulation
+        and cached. Like :meth:`.objects.Vector.as_numpy`, views are only valid until the
+        next simulation.
+
+        :param interval: Sampling interval, defaults to ``dt``.
+        :type interval: float
+        :param start: Time of the first sample.
+        :type start: float
+        :param stop: Time of the last sample.
+        :type stop: float
+        :rtype: numpy.ndarray
+        """
+        import numpy
+
+        t = self.time.as_numpy()
+        if interval is None and start is None and stop is None:
+            return t
+        dt = self.dt
+        step = interval if interval is not None else dt
+        n = round(step / dt)
+        if not self.cvode.active() and n >= 1 and math.isclose(n * dt, step):
+            first = math.ceil(start / dt - 1e-9) if start is not None else 0
+            last = math.floor(stop / dt + 1e-9) + 1 if stop is not None else len(t)
+            return t[first:last:n]
+        key = (interval, start, stop)
+        end = float(t[-1]) if len(t) else None
+        try:
+            cached_end, times = self._sample_times[key]
+        except KeyError:
+            cached_end = times = None
+        if times is None or cached_end != end:
+            if end is None:
+                times = numpy.empty(0)
+            else:
+                start = start if start is not None else 0
+                stop = min(stop, end) if stop is not None else end
+                times = numpy.arange(start, stop + step / 2, step)
+            self._sample_times[key] = (end, times)
+        return times
 
     def finitialize(self, initial=None):
         self.parallel.set_maxstep(10)
         self._setup_transfer()
+        if self._time is not None or self._recordings:
+            # Record the time alongside the recordings, for `sample_times`.
+            self.time
         if initial is not None:
             self.__h.finitialize(initial)
         else:
@@ -289,7 +978,119 @@ class PythonHocInterpreter:
 
     def run(self, duration, v_init=None, reset=True):
         self._do_init(v_init, reset=reset)
-        self.__h.continuerun(duration)
+        self._advance(duration, self.__h.continuerun)
+
+    def add_chunk_hook(self, hook, duration, priority=0):
+        """
+        Advance :meth:`run`, :meth:`continuerun` and ``parallel.psolve`` in chunks of at
+        most ``duration`` ms of simulated time, and call ``hook`` after every chunk. With
+        several hooks, the simulation advances in chunks of the shortest duration and
+        every hook is called after every chunk, those with a lower ``priority`` first.
+        """
+        if duration <= 0:
+            raise ValueError("Chunk duration must be positive.")
+        self._chunk_hooks[hook] = (duration, priority)
+
+    def remove_chunk_hook(self, hook):
+        """
+        Remove a hook added with :meth:`add_chunk_hook`.
+        """
+        self._chunk_hooks.pop(hook, None)
+
+    def _advance(self, tstop, solve):
+        if not self._chunk_hooks:
+            return solve(tstop)
+        chunk = min(duration for duration, _ in self._chunk_hooks.values())
+        t = self.__h.t
+        # Fixed chunk boundaries, so that rounding of `t` doesn't create extra chunks.
+        n = max(1, math.ceil((tstop - t) / chunk - 1e-9))
+        for i in range(1, n + 1):
+            solve(min(t + i * chunk, tstop))
+            hooks = sorted(self._chunk_hooks.items(), key=lambda item: item[1][1])
+            for hook, _ in hooks:
+                hook()
+
+    def record_to_disk(self, path, recordings, *, chunk=100):
+        """
+        Stream recorded Vectors to a file on disk while the simulation runs. The
+        simulation advances in chunks of ``chunk`` ms, after which the samples are
+        appended to the file and the Vectors are emptied. The simulation time is recorded
+        along with them, so create the sink before initializing the simulation.
+
+        Vectors recorded at given time points (``record(ptr, tvec)``) can't be emptied
+        and can't be streamed.
+
+        :param path: Path of the data file. The index is stored in ``<path>.json``.
+        :param recordings: Sequence or dictionary of the Vectors to stream.
+        :param chunk: Duration of the chunks in ms.
+        :returns: The sink, use it as a context manager or close it to stop streaming.
+        :rtype: :class:`~.traces.TraceSink`
+        """
+        return TraceSink(self, path, recordings, chunk)
+
+    def snapshot(self):
+        """
+        Take an in-memory snapshot of the state of the simulation with NEURON's
+        ``SaveState``, so that the simulation can be restored to this point any number of
+        times with :meth:`restore`. The lengths of all Vectors recorded with Patch, and of
+        the Vectors that record spikes with ``NetCon.record`` or
+        ``parallel.spike_record``, are stored along with it, as is the progress of reduced
+        recordings.
+
+        :rtype: :class:`~.objects.Snapshot`
+        :raises: UninitializedError if the simulation hasn't been initialized.
+        """
+        if not self._finitialized:
+            raise UninitializedError(
+                "The simulation must be initialized before a snapshot can be taken."
+            )
+        reducers = [
+            vector._reducer
+            for vector in self._recordings
+            if getattr(vector, "_reducer", None) is not None
+        ]
+        for reducer in reducers:
+            # Reduce the buffered samples, so that the buffers are empty at the snapshot.
+            reducer()
+        state = self.__h.SaveState()
+        state.save()
+        recordings = weakref.WeakKeyDictionary(
+            (vector, len(vector))
+            for vector in (*self._recordings, *self._event_recordings)
+        )
+        reducers = weakref.WeakKeyDictionary(
+            (reducer, reducer._save()) for reducer in reducers
+        )
+        return Snapshot(state, self.__h.t, recordings, reducers)
+
+    def restore(self, snapshot, recordings="truncate"):
+        """
+        Restore the simulation to the state of a :meth:`snapshot`. Afterwards, use
+        :meth:`continuerun`, ``run(..., reset=False)`` or ``parallel.psolve`` to continue
+        the simulation from the restored state without reinitializing it.
+
+        :param snapshot: The snapshot to restore.
+        :type snapshot: :class:`~.objects.Snapshot`
+        :param recordings: ``"truncate"`` to cut the Vectors that were recorded at the
+          time of the snapshot back to their length at that time, so that continued
+          recordings line up, or ``"keep"`` to leave all recorded data as is.
+        :type recordings: str
+        """
+        if recordings not in ("truncate", "keep"):
+            raise ValueError(
+                f"`recordings` must be 'truncate' or 'keep', not '{recordings}'."
+            )
+        snapshot._state.restore()
+        cvode = self.__h.CVode()
+        if cvode.active():
+            cvode.re_init()
+        if recordings == "truncate":
+            for vector, length in snapshot._recordings.items():
+                if len(vector) > length:
+                    transform(vector).resize(length)
+            for reducer, progress in snapshot._reducers.items():
+                reducer._restore(progress)
+        self._finitialized = True
 
     def _do_init(self, v_init=None, reset=False):
         if reset or not self._finitialized:
@@ -304,6 +1105,13 @@ class PythonHocInterpreter:
         except HocSectionAccessError:  # pragma: nocover
             return None
 
+    def error_scope(self):
+        """
+        Return a context manager in which all Patch operations share one capture of
+        NEURON's output, for fast bulk building. See :func:`.error_handler.error_scope`.
+        """
+        return error_scope()
+
     def _init_pc(self):
         if not hasattr(self, "_PythonHocInterpreter__pc"):
             pc = ParallelContext(self, self.__h.ParallelContext())
@@ -330,31 +1138,28 @@ class PythonHocInterpreter:
         self._init_pc()
         return self.__pc
 
-    def record(self, target):
+    def record(self, target, **kwargs):
+        """
+        Record a target into a new Vector. See :meth:`.objects.Vector.record` for the
+        options.
+        """
         v = self.Vector()
-        v.record(target)
+        v.record(target, **kwargs)
         return v
 
     @classmethod
-    def _wrap_point_processes(cls):
-        # Filter out all the point processes in the interpreter
-        point_processes = [k for k in dir(cls.__h) if is_point_process(k)]
-        old_point_processes = cls.__point_processes
-        # Check if there are any new things to wrap.
-        for point_process in set(point_processes) - set(old_point_processes):
-            # For each point process check if a function already exists, if not, wrap the
-            # HocInterpreter factory function.
-            if point_process not in cls.__dict__:
-                setattr(cls, point_process, cls._wrap_point_process(point_process))
-        cls.__point_processes = point_processes
+    def _is_point_process(cls, name):
+        try:
+            return cls.__point_processes[name]
+        except KeyError:
+            result = cls.__point_processes[name] = is_point_process(name)
+            return result
 
     @classmethod
     def _wrap_point_process(cls, point_process):
-        # Create a function that has the right `f.__code__.co_name` for error messages.
-        exec(
-            f"""def {point_process}(self, target, *args, **kwargs):
-            h = getattr(self, '_PythonHocInterpreter__h')
-            factory = getattr(h, '{point_process}')
+        factory = getattr(cls.__h, point_process)
+
+        def wrapper(self, target, *args, **kwargs):
             og_target = target
             if hasattr(target, "__arc__"):
                 target = target(target.__arc__(), ephemeral=True)
@@ -364,10 +1169,13 @@ class PythonHocInterpreter:
             if hasattr(og_target, "__ref__"):
                 og_target.__ref__(point_process)
             point_process.__ref__(og_target)
-            return point_process"""
-        )
+            return point_process
 
-        return locals()[point_process]
+        # Give the function the right `f.__code__.co_name` for error messages.
+        wrapper.__code__ = wrapper.__code__.replace(co_name=point_process)
+        wrapper.__name__ = point_process
+        wrapper.__qualname__ = f"{cls.__name__}.{point_process}"
+        return wrapper
 
     def _setup_transfer(self):  # pragma: nocover
         v = self.__h.Vector()
@@ -407,6 +1215,101 @@ class ParallelContext(PythonHocObject):
             target.__ref__(nc)
         return nc
 
+    def register_cells(self, gids, sources, *, threshold=-20, output=True):
+        """
+        Register a population of cells on this node in bulk: create a spike detector
+        for each source, assign its GID to this node and associate the detector with it.
+
+        :param gids: Array of GIDs, one per source.
+        :param sources: Sequence of sources (sections, segments, point processes, ...)
+        :param threshold: Scalar or array with the spike threshold of each source.
+        :param output: Whether the spikes of the cells should be transmitted to other
+          nodes.
+        :returns: The spike detectors, with the GID of each detector.
+        :rtype: :class:`~.objects.NetConCollection`
+        """
+        import numpy
+
+        gids = numpy.asarray(gids, dtype=int).ravel()
+        if len(gids) != len(sources):
+            raise ValueError(
+                f"Got {len(gids)} GIDs but {len(sources)} sources, lengths must match."
+            )
+        if self._warn_new_gids and len(gids):
+            warnings.warn(
+                "New GIDs registered after `spike_record` was called."
+                " These GIDs will not be recorded."
+            )
+        detectors = self._interpreter.NetCons(sources, None)
+        detectors._gids = gids
+        pc = transform(self)
+        node = self.id()
+        for gid, nc in zip(gids.tolist(), detectors._pointers):
+            pc.set_gid2node(gid, node)
+            pc.cell(gid, nc)
+            if output:
+                pc.outputcell(gid)
+        # Set the thresholds after registration, like `ParallelCon` does.
+        detectors.threshold = threshold
+        return detectors
+
+    def connect_gids(self, pre_gids, targets, *, weight=None, delay=None):
+        """
+        Connect the spikes of many GIDs to targets in bulk. ``pre_gids`` and ``targets``
+        are sequences of equal length, or a single value that is connected to every item
+        of the other sequence.
+
+        :param pre_gids: Array of presynaptic GIDs.
+        :param targets: Sequence of targets (synapses, ...)
+        :param weight: Scalar or array with the weight of each connection. Keeps
+          NEURON's default if omitted.
+        :param delay: Scalar or array with the delay of each connection. Keeps NEURON's
+          default if omitted.
+        :returns: The receiving NetCons, with the presynaptic GID of each NetCon.
+        :rtype: :class:`~.objects.NetConCollection`
+        """
+        import numpy
+
+        if _is_sequence(targets):
+            n = len(targets)
+        elif numpy.ndim(pre_gids):
+            n = len(pre_gids)
+            targets = [targets] * n
+        else:
+            raise TypeError("Either the GIDs or targets must be a sequence.")
+        if numpy.ndim(pre_gids):
+            pre_gids = numpy.asarray(pre_gids, dtype=int).ravel()
+            if len(pre_gids) != n:
+                raise ValueError(
+                    f"Got {len(pre_gids)} GIDs but {n} targets, lengths must match."
+                )
+        else:
+            pre_gids = numpy.full(n, pre_gids, dtype=int)
+        # Memoize the NEURON pointer of each distinct target.
+        target_ptrs = {}
+        gid_connect = transform(self).gid_connect
+        pointers = []
+        for gid, target in zip(pre_gids.tolist(), targets):
+            try:
+                nrn_target = target_ptrs[id(target)]
+            except KeyError:
+                nrn_target = target_ptrs[id(target)] = transform_netcon(target)
+            pointers.append(gid_connect(gid, nrn_target))
+        unique_targets = list({id(t): t for t in targets}.values())
+        connections = NetConCollection(
+            self._interpreter, pointers, [], unique_targets, gids=pre_gids
+        )
+        # Forbid set threshold. See https://github.com/neuronsimulator/nrn/issues/2135
+        connections._nothreshold = True
+        if weight is not None:
+            connections.weight = weight
+        if delay is not None:
+            connections.delay = delay
+        for target in unique_targets:
+            if hasattr(target, "__ref__"):
+                target.__ref__(connections)
+        return connections
+
     @_safe_call
     def source_var(self, call_result, *args, **kwargs):  # pragma: nocover
         key = args[-1]
@@ -438,6 +1341,9 @@ class ParallelContext(PythonHocObject):
         if gid_vector is None:
             gid_vector = self._interpreter.Vector()
         transform(self).spike_record(gids, transform(time_vector), transform(gid_vector))
+        for vector in (time_vector, gid_vector):
+            if hasattr(vector, "__ref__"):
+                self._interpreter._event_recordings.add(vector)
         if gids == -1:
             self._warn_new_gids = True
         return time_vector, gid_vector
@@ -484,30 +1390,98 @@ class ParallelContext(PythonHocObject):
     def _broadcast(self, data, root=0):
         import pickle
 
+        payload = None
         if self.id() == root:
             try:
-                v = self._interpreter.Vector(list(pickle.dumps(data)))
+                payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
             except Exception as e:
-                # Send an empty vector so the other nodes don't hang waiting for a broadcast.
-                transform(self).broadcast(transform(self._interpreter.Vector()), root)
+                # Transmit the failure so the other nodes don't hang waiting for data.
+                self._broadcast_bytes(None, root)
                 raise BroadcastError(str(e)) from None
-        else:
-            v = self._interpreter.Vector()
-        v = transform(v)
-        transform(self).broadcast(v, root)
+        payload = self._broadcast_bytes(payload, root)
+        if payload is None:
+            raise BroadcastError("Root node did not transmit. Look for root node error.")
+        return pickle.loads(payload)
+
+    def _broadcast_bytes(self, payload, root=0):
+        """
+        Broadcast a bytes payload from the root node, or ``None`` to signal a failure on
+        the root node. The length of the payload is sent first, followed by the payload
+        in chunks of at most ``_BROADCAST_CHUNK`` bytes. Uses mpi4py if it shares its
+        world with this ParallelContext, and HOC Vectors otherwise.
+        """
+        comm = self._mpi_comm()
+        if comm is not None:
+            return self._broadcast_bytes_mpi(comm, payload, root)
+        return self._broadcast_bytes_hoc(payload, root)
+
+    def _mpi_comm(self):
+        if self.nhost() == 1:
+            # Don't let mpi4py initialize MPI when NEURON didn't.
+            return None
         try:
-            return pickle.loads(bytes([int(d) for d in v]))
-        except EOFError:
-            raise BroadcastError(
-                "Root node did not transmit. Look for root node error."
-            ) from None
+            from mpi4py import MPI
+        except ImportError:  # pragma: nocover
+            return None
+        comm = MPI.COMM_WORLD
+        return comm if comm.Get_size() == self.nhost() else None
+
+    def _broadcast_bytes_mpi(self, comm, payload, root):
+        import numpy
+
+        header = numpy.array([len(payload) if payload else 0], dtype=numpy.int64)
+        comm.Bcast(header, root=root)
+        n = int(header[0])
+        if not n:
+            return None
+        if payload is not None:
+            buffer = numpy.frombuffer(bytearray(payload), dtype=numpy.uint8)
+        else:
+            buffer = numpy.empty(n, dtype=numpy.uint8)
+        for start in range(0, n, _BROADCAST_CHUNK):
+            comm.Bcast(buffer[start : start + _BROADCAST_CHUNK], root=root)
+        return payload if payload is not None else buffer.tobytes()
+
+    def _broadcast_bytes_hoc(self, payload, root):
+        import numpy
+
+        pc = transform(self)
+        header = self._interpreter.Vector.from_numpy(
+            [len(payload) if payload else 0]
+        ).__neuron__()
+        pc.broadcast(header, root)
+        n = int(header[0])
+        if not n:
+            return None
+        # Pack 6 bytes in each double, they're represented exactly as integers below
+        # 2 ** 53.
+        words = numpy.zeros((-(-min(n, _BROADCAST_CHUNK) // 6), 8), dtype=numpy.uint8)
+        v = self._interpreter.Vector().__neuron__()
+        received = numpy.empty(n, dtype=numpy.uint8) if payload is None else None
+        for start in range(0, n, _BROADCAST_CHUNK):
+            stop = min(start + _BROADCAST_CHUNK, n)
+            size = -(-(stop - start) // 6)
+            v.resize(size)
+            if payload is not None:
+                chunk = numpy.zeros(size * 6, dtype=numpy.uint8)
+                chunk[: stop - start] = numpy.frombuffer(
+                    payload, dtype=numpy.uint8, count=stop - start, offset=start
+                )
+                words[:size, :6] = chunk.reshape(size, 6)
+                v.as_numpy()[:] = words[:size].view("<u8").ravel()
+            pc.broadcast(v, root)
+            if payload is None:
+                words[:size] = (
+                    v.as_numpy().astype("<u8").view(numpy.uint8).reshape(size, 8)
+                )
+                received[start:stop] = words[:size, :6].ravel()[: stop - start]
+        return payload if payload is not None else received.tobytes()
 
     def psolve(self, tstop, v_init=None):
         self_ = transform(self)
         self_.set_maxstep(10)
         self._interpreter._do_init(v_init)
-        self_.psolve(tstop)
+        self._interpreter._advance(tstop, self_.psolve)
 
 
 PythonHocInterpreter._process_registration_queue()
-PythonHocInterpreter._wrap_point_processes()
@@ -1,6 +1,10 @@
+import math
 import typing
+import weakref
+from functools import cache
 from typing import Sequence, Union
 
+from .catalog import catalog
 from .core import _is_sequence, transform, transform_record
 from .error_handler import CatchRecord, catch_hoc_error
 
@@ -38,9 +42,9 @@ class PythonHocObject:
 
     def __init__(self, interpreter: "PythonHocInterpreter", ptr):
         # Initialize ourselves with a reference to our own "pointer"
-        # and prepare a list for other references.
+        # and prepare a registry for other references.
         self._neuron_ptr = transform(ptr)
-        self._references = []
+        self._references = References()
         self._interpreter = interpreter
         super().__init__()
 
@@ -107,19 +111,28 @@ class PythonHocObject:
         Magic method that is called when a strong reference needs to be stored on the
         object.
         """
-        if obj not in self._references:
-            self._references.append(obj)
+        self._references.add(obj)
 
     def __deref__(self, obj):
         """
         Magic method that is called when a strong reference needs to be removed from the
         object.
         """
-        try:
-            self._references.remove(obj)
-            return True
-        except ValueError:
-            return False
+        return self._references.discard(obj)
+
+    def __ref_many__(self, objs):
+        """
+        Magic method that is called when strong references to many objects need to be
+        stored on the object.
+        """
+        self._references.add_many(objs)
+
+    def __deref_many__(self, objs):
+        """
+        Magic method that is called when strong references to many objects need to be
+        removed from the object. Returns the number of removed references.
+        """
+        return self._references.discard_many(objs)
 
     def _safe_call(self, func_name, *args, **kwargs):
         """
@@ -132,6 +145,109 @@ class PythonHocObject:
         return func(*args, **kwargs)
 
 
+class References:
+    """
+    Registry of the strong references an object keeps, keyed by identity, so that
+    adding and removing references are O(1) operations. Iterating over it yields the
+    referenced objects in the order they were added.
+    """
+
+    __slots__ = ("_refs",)
+
+    def __init__(self):
+        self._refs = {}
+
+    def add(self, obj):
+        """
+        Store a strong reference to ``obj``.
+
+        :returns: Whether the reference is new.
+        :rtype: bool
+        """
+        key = id(obj)
+        if key in self._refs:
+            return False
+        self._refs[key] = obj
+        return True
+
+    def add_many(self, objs):
+        """
+        Store strong references to all the given objects.
+        """
+        self._refs.update((id(obj), obj) for obj in objs)
+
+    def discard(self, obj):
+        """
+        Remove the reference to ``obj``, or to another object that transforms into the
+        same NEURON object.
+
+        :returns: Whether a reference was removed.
+        :rtype: bool
+        """
+        key = id(obj)
+        if key not in self._refs:
+            key = self._find(obj)
+            if key is None:
+                return False
+        del self._refs[key]
+        return True
+
+    def discard_many(self, objs):
+        """
+        Remove the references to all the given objects.
+
+        :returns: The number of removed references.
+        :rtype: int
+        """
+        return sum(self.discard(obj) for obj in objs)
+
+    def _find(self, obj):
+        # Fall back to finding a wrapper of the same NEURON object.
+        ptr = transform(obj)
+        for key, ref in self._refs.items():
+            if transform(ref) is ptr:
+                return key
+        return None
+
+    def __contains__(self, obj):
+        return id(obj) in self._refs or self._find(obj) is not None
+
+    def __len__(self):
+        return len(self._refs)
+
+    def __iter__(self):
+        return iter(self._refs.values())
+
+    def __getitem__(self, index):
+        return list(self._refs.values())[index]
+
+    def __repr__(self):
+        return f"<References to {len(self)} objects>"
+
+
+def reference_graph(*roots):
+    """
+    Walk the strong references that objects keep to each other, starting from the given
+    objects, to find out what keeps what alive.
+
+    :returns: The ``(referrer, referenced)`` pairs of all objects reachable from the
+      roots.
+    :rtype: List[Tuple[Any, Any]]
+    """
+    edges = []
+    seen = set()
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        for ref in getattr(obj, "_references", ()):
+            edges.append((obj, ref))
+            stack.append(ref)
+    return edges
+
+
 class Connectable:
     def __init__(self, *args, **kwargs):
         # Prepare a dictionary that lists which other NEURON parts this is connected to
@@ -148,25 +264,47 @@ class PointerWrapper:
             return self
 
         value = getattr(instance.__neuron__(), self._attr)
-        t = instance._interpreter.t
+        if instance.raw_values:
+            return value
+        simulation_value = _simulation_value_type(type(value), self._attr)(value)
+        simulation_value._instance = instance
+        return simulation_value
 
-        class SimulationValue(type(value)):
-            def __record__(v):
-                return getattr(instance.__neuron__(), f"_ref_{self._attr}")
+    def __set__(self, instance, value):
+        setattr(instance.__neuron__(), self._attr, value)
 
-            def __str__(v):
-                return str(type(value)(v))
 
-            def __repr__(v):
-                return f"<{self._attr}={value} at t={t} of {instance}>"
+@cache
+def _simulation_value_type(value_type, attr):
+    """
+    Create the class of the values returned by a :class:`PointerWrapper`, once per type
+    of value and attribute.
+    """
 
-        return SimulationValue(value)
+    class SimulationValue(value_type):
+        __slots__ = ("_instance",)
 
-    def __set__(self, instance, value):
-        setattr(instance.__neuron__(), self._attr, value)
+        def __record__(v):
+            return getattr(v._instance.__neuron__(), f"_ref_{attr}")
+
+        def __str__(v):
+            return str(value_type(v))
+
+        def __repr__(v):
+            t = v._instance._interpreter.t
+            return f"<{attr}={value_type(v)} at t={t} of {v._instance}>"
+
+    return SimulationValue
 
 
 class WrapsPointers:
+    raw_values = False
+    """
+    Set to ``True`` to have the wrapped parameters return plain values instead of
+    recordable simulation values, for faster access in hot loops. Can be set on
+    individual objects or on the class.
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._init_pointers_wrappers()
@@ -176,23 +314,39 @@ class WrapsPointers:
         target = self.__neuron__()
         hoctype = str(target).split("[")[0].split("_0x")[0]
         if hoctype not in _had_pointers_wrapped:
-            params = []
-            for k in dir(target):
-                if not k.startswith("_"):
-                    try:
-                        ptr_str = str(getattr(target, f"_ref_{k}", None))
-                        is_ptr = ptr_str.startswith("<pointer") or ptr_str.startswith(
-                            "data_handle"
-                        )
-                    except:
-                        is_ptr = False
-                    if is_ptr:
-                        setattr(cls, k, PointerWrapper(k))
-                        params.append(k)
+            # The parameters of sections and segments depend on the inserted mechanisms,
+            # only the parameters of HOC types can be cataloged.
+            cataloged = type(target).__module__ == "hoc"
+            params = catalog.get(hoctype) if cataloged else None
+            if params is None:
+                params = _introspect_pointers(target)
+                if cataloged:
+                    catalog.add(hoctype, params)
+            for k in params:
+                setattr(cls, k, PointerWrapper(k))
             _had_pointers_wrapped[hoctype] = params
         self.parameters = _had_pointers_wrapped[hoctype]
 
 
+def _introspect_pointers(target):
+    """
+    Find the attributes of a NEURON object that can be referenced with a pointer.
+    """
+    params = []
+    for k in dir(target):
+        if not k.startswith("_"):
+            try:
+                ptr_str = str(getattr(target, f"_ref_{k}", None))
+                is_ptr = ptr_str.startswith("<pointer") or ptr_str.startswith(
+                    "data_handle"
+                )
+            except:
+                is_ptr = False
+            if is_ptr:
+                params.append(k)
+    return params
+
+
 class Section(PythonHocObject, Connectable, WrapsPointers):
     def connect(self, target, *args, **kwargs):
         """
@@ -238,23 +392,93 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
         return self(self.__arc__()).__record__()
 
     def __call__(self, x, ephemeral=False, *args, **kwargs):
-        v = super().__call__(x, *args, **kwargs)
-        if type(v).__name__ != "Segment":  # pragma: no cover
-            raise TypeError("Section call did not return a Segment.")
-        seg = Segment(self._interpreter, v, self)
-        if not ephemeral:
+        """
+        Return the Segment at ``x``. Segment wrappers are interned per segment: calling
+        the Section again at the center of a segment, or at ``x`` 0 and 1, returns the
+        same object. Wrappers at other positions in the segment keep their ``x``, and
+        share the references of the interned wrapper, so that they don't add references
+        to the Section.
+
+        :param ephemeral: Don't store the Segment on the Section, so that it can be
+          garbage collected. Returns the interned Segment if there is one at ``x``.
+        """
+        nseg = self.__neuron__().nseg
+        segments = self._get_segments(nseg)
+        index = _segment_index(x, nseg)
+        interned = segments.get(index)
+        if interned is not None and interned.x == x:
+            return interned
+        seg = self._segment(x, *args, **kwargs)
+        if ephemeral:
+            return seg
+        if index is None:
             # By default store references to segments, but allow for them to be
             # garbage collected if `ephemeral=True`
             seg.__ref__(self)
             self.__ref__(seg)
+            return seg
+        if interned is None:
+            center = (
+                0.0 if index == -1 else 1.0 if index == nseg else (index + 0.5) / nseg
+            )
+            interned = seg if x == center else self._segment(center)
+            interned.__ref__(self)
+            self.__ref__(interned)
+            segments[index] = interned
+        if seg is not interned:
+            seg.__dict__["_references"] = interned._references
+            seg.__dict__["_connections"] = interned._connections
         return seg
 
+    def _segment(self, x, *args, **kwargs):
+        v = super().__call__(x, *args, **kwargs)
+        if type(v).__name__ != "Segment":  # pragma: no cover
+            raise TypeError("Section call did not return a Segment.")
+        return Segment(self._interpreter, v, self)
+
     def __iter__(self, *args, **kwargs):
         iter = super().__iter__(*args, **kwargs)
-        for v in iter:
+        segments = self._get_segments(self.__neuron__().nseg)
+        for index, v in enumerate(iter):
             if type(v).__name__ != "Segment":  # pragma: no cover
                 raise TypeError("Section iteration did not return a Segment.")
-            yield Segment(self._interpreter, v, self)
+            seg = segments.get(index)
+            yield seg if seg is not None else Segment(self._interpreter, v, self)
+
+    def _get_segments(self, nseg):
+        # Interned Segments per index, -1 and `nseg` are the 0 and 1 ends.
+        segments = self.__dict__.get("_segments")
+        if segments is None or self.__dict__["_segments_nseg"] != nseg:
+            if segments:
+                # The Segments are stale, but keep what they kept alive on the Section.
+                for seg in segments.values():
+                    self.__ref_many__(ref for ref in seg._references if ref is not self)
+                self.__deref_many__(segments.values())
+            segments = self.__dict__["_segments"] = {}
+            self.__dict__["_segments_nseg"] = nseg
+        return segments
+
+    def get(self, name):
+        """
+        Return a range variable of every segment of the Section as an array. See
+        :meth:`~.interpreter.PythonHocInterpreter.get`.
+
+        :param name: Name of the range variable, e.g. ``"v"`` or ``"gnabar_hh"``.
+        :rtype: numpy.ndarray
+        """
+        return self._interpreter.get(self, name)
+
+    def set(self, name, values):
+        """
+        Set a range variable of every segment of the Section, e.g. a gradient along a
+        dendrite with ``dend.set("gnabar_hh", lambda x: 0.12 * (1 - x))``. See
+        :meth:`~.interpreter.PythonHocInterpreter.set`.
+
+        :param name: Name of the range variable.
+        :param values: A value for every segment, a single value for all of them, or a
+          function of the ``x`` of every segment.
+        """
+        self._interpreter.set(self, name, values)
 
     def insert(self, *args, **kwargs):
         """
@@ -295,12 +519,19 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
         :param diameters: A scalar or array of diameters corresponding to the points. Default value is the section diameter.
         :type diameters: float or array
         """
+        import numpy
+
+        points = numpy.asarray(points, dtype=float).reshape(-1, 3)
         if diameters is None:
-            diameters = [self.diam for _ in range(len(points))]
-        if not _is_sequence(diameters):
-            diameters = [diameters for _ in range(len(points))]
+            diameters = self.diam
+        diameters = _broadcast_values(diameters, len(points), "diameter")
+        if not self.n3d():
+            # The Vector overload of `pt3dadd` replaces all points, so it can only be
+            # used to add points to sections without points.
+            _set_3d_points(self._interpreter, self.__neuron__(), points, diameters)
+            return
         self.__neuron__().push()
-        for point, diameter in zip(points, diameters):
+        for point, diameter in zip(points.tolist(), diameters.tolist()):
             self._interpreter.pt3dadd(*point, diameter)
         self._interpreter.pop_section()
 
@@ -309,15 +540,7 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
         """
         Return the 3d point information associated to this section.
         """
-        import numpy
-
-        return numpy.column_stack(
-            (
-                [self.x3d(n) for n in range(self.n3d())],
-                [self.y3d(n) for n in range(self.n3d())],
-                [self.z3d(n) for n in range(self.n3d())],
-            )
-        )
+        return self._interpreter.geometry([self]).xyz
 
     def wholetree(self):
         """
@@ -327,15 +550,19 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
         """
         return [Section(self._interpreter, s) for s in self.__neuron__().wholetree()]
 
-    def record(self, x=None):
+    def record(self, x=None, **kwargs):
         """
         Record the Section at a certain point.
 
         :param x: Arcpoint, defaults to ``__arc__`` if omitted.
         :type x: float
+        :param kwargs: Sampling options, see :meth:`.Vector.record`. Recordings with
+          sampling options aren't stored in ``recordings``.
         """
         if x is None:
             x = self.__arc__()
+        if kwargs:
+            return self._interpreter.Vector().record(self(x), **kwargs)
         if not hasattr(self, "recordings"):
             self.recordings = {}
         if not x in self.recordings:
@@ -374,7 +601,8 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
         *,
         x: float = 0.5,
         delay: float = 0,
-        duration: float = 100,
+        duration: float = None,
+        sample_interval: float = None,
     ) -> "IClamp":
         """
         Create a current clamp on the section.
@@ -383,19 +611,28 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
         :type x: float
         :param delay: Duration of the pre-step holding interval, from `0` to `delay` ms.
         :type delay: float
-        :param duration: Duration of the step interval, from `delay` to `delay + duration` ms.
+        :param duration: Duration of the step interval, from `delay` to `delay + duration`
+          ms. Defaults to 100 ms, or to the duration of the waveform if `amplitude` is a
+          sequence.
         :type duration: float
         :param amplitude: Can be a single value to define the current during the step
-          (`delay` to `delay + duration` ms), or a sequence to play after `delay` ms. This
-          will play 1 value of the sequence into the clamp per timestep.
-        :type amplitude: Union[float, List[float]]
+          (`delay` to `delay + duration` ms), or a sequence or array to play after `delay`
+          ms, 1 value per `sample_interval`. See :meth:`.IClamp.play`.
+        :type amplitude: Union[float, List[float], numpy.ndarray]
+        :param sample_interval: Time between the values of an `amplitude` sequence,
+          defaults to ``dt``.
+        :type sample_interval: float
         :returns: The current clamp placed in the section.
-        :rtype: :class:`.objects.SEClamp`
+        :rtype: :class:`.objects.IClamp`
         """
         clamp = self._interpreter.IClamp(x=x, sec=self)
         clamp.delay = delay
-        clamp.duration = duration
-        clamp.amplitude = amplitude
+        if _is_sequence(amplitude):
+            waveform = clamp.play(amplitude, sample_interval)
+            clamp.duration = duration if duration is not None else waveform.duration
+        else:
+            clamp.duration = duration if duration is not None else 100
+            clamp.amplitude = amplitude
         return clamp
 
     def vclamp(
@@ -407,6 +644,7 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
         duration: float = 100,
         after: float = 0,
         holding=-70,
+        sample_interval: float = None,
     ) -> "SEClamp":
         """
         Create a voltage clamp on the section.
@@ -422,17 +660,24 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
           to `delay + duration + after` ms.
         :type after: float
         :param voltage: Can be a single value to define the voltage during the step
-          (`delay` to `delay + duration` ms), or 3 values to define the pre-step, step and
-          post-step voltages altogether.
-        :type voltage: Union[float, List[float]]
-        :param holding: If `voltage` is a single value, `holding` is used for the pre-step
-          and post-step voltages.
+          (`delay` to `delay + duration` ms), 3 values to define the pre-step, step and
+          post-step voltages altogether, or a command waveform to play after `before` ms,
+          1 value per `sample_interval`. See :meth:`.SEClamp.play`.
+        :type voltage: Union[float, List[float], numpy.ndarray]
+        :param holding: If `voltage` is a single value or a waveform, `holding` is used
+          for the pre-step and post-step voltages.
         :type holding: float
+        :param sample_interval: Time between the values of a `voltage` waveform, defaults
+          to ``dt``. A sequence of 3 values is only played as a waveform if it is given.
+        :type sample_interval: float
         :returns: The single electrode voltage clamp placed in the section.
         :rtype: :class:`.objects.SEClamp`
         """
         clamp = self._interpreter.SEClamp(x=x, sec=self)
         clamp._holding = holding
+        if _is_sequence(voltage) and (len(voltage) != 3 or sample_interval is not None):
+            clamp.play(voltage, sample_interval, before=before, after=after)
+            return clamp
         clamp.delay = before
         clamp.duration = duration
         clamp.after = after
@@ -460,6 +705,92 @@ class Section(PythonHocObject, Connectable, WrapsPointers):
             )
 
 
+def _set_3d_points(interpreter, section, points, diameters, vectors=None):
+    """
+    Replace the 3D points of a NEURON section in bulk, with the Vector overload of
+    ``pt3dadd``. Pass 4 NEURON Vectors as ``vectors`` to reuse them as buffers.
+    """
+    if vectors is None:
+        vectors = [transform(interpreter.Vector()) for _ in range(4)]
+    for vector, column in zip(vectors, (*points.T, diameters)):
+        vector.resize(len(column))
+        vector.as_numpy()[:] = column
+    interpreter.pt3dadd(*vectors, sec=section)
+
+
+def _read_geometry(section):
+    """
+    Read the 3D points, diameters and arc lengths of a NEURON section, and the position
+    of its segment midpoints along its 3D points.
+    """
+    import numpy
+
+    n = section.n3d()
+    indices = range(n)
+    columns = [
+        numpy.fromiter(map(getter, indices), dtype=float, count=n)
+        for getter in (
+            section.x3d,
+            section.y3d,
+            section.z3d,
+            section.diam3d,
+            section.arc3d,
+        )
+    ]
+    xyz = numpy.column_stack(columns[:3]).reshape(n, 3)
+    diam, arc = columns[3:]
+    segment_x = (numpy.arange(section.nseg) + 0.5) / section.nseg
+    if n:
+        segment_arc = segment_x * section.L
+        segment_xyz = numpy.column_stack(
+            [numpy.interp(segment_arc, arc, column) for column in columns[:3]]
+        )
+    else:
+        segment_xyz = numpy.full((section.nseg, 3), numpy.nan)
+    return xyz, diam, arc, segment_x, segment_xyz
+
+
+class Geometry:
+    """
+    Geometry of a set of sections, in contiguous arrays. The 3D points of the ``i``-th
+    section are ``xyz[point_offsets[i]:point_offsets[i + 1]]``, and its segment midpoints
+    are ``segment_xyz[segment_offsets[i]:segment_offsets[i + 1]]``. Sections without 3D
+    points have ``nan`` segment midpoints.
+    """
+
+    def __init__(self, sections, parts):
+        import numpy
+
+        self.sections = sections
+        xyz, diam, arc, segment_x, segment_xyz = zip(*parts) if parts else ((),) * 5
+        self.xyz = numpy.concatenate(xyz) if parts else numpy.empty((0, 3))
+        self.diam = numpy.concatenate(diam) if parts else numpy.empty(0)
+        self.arc = numpy.concatenate(arc) if parts else numpy.empty(0)
+        self.point_offsets = numpy.cumsum([0, *map(len, diam)])
+        self.segment_x = numpy.concatenate(segment_x) if parts else numpy.empty(0)
+        self.segment_xyz = (
+            numpy.concatenate(segment_xyz) if parts else numpy.empty((0, 3))
+        )
+        self.segment_offsets = numpy.cumsum([0, *map(len, segment_x)])
+
+    def __len__(self):
+        return len(self.sections)
+
+    def points(self, index):
+        """
+        Return the 3D points of the ``index``-th section.
+        """
+        return self.xyz[self.point_offsets[index] : self.point_offsets[index + 1]]
+
+    def segments(self, index):
+        """
+        Return the segment midpoints of the ``index``-th section.
+        """
+        return self.segment_xyz[
+            self.segment_offsets[index] : self.segment_offsets[index + 1]
+        ]
+
+
 class _SectionStackContextManager:
     def __init__(self, section):
         self._section = section
@@ -478,13 +809,232 @@ class SectionRef(PythonHocObject):
 
 
 class Vector(PythonHocObject):
-    def record(self, target, *args, **kwargs):
+    def record(
+        self,
+        target,
+        *args,
+        interval=None,
+        start=None,
+        stop=None,
+        reduce=None,
+        **kwargs,
+    ):
+        """
+        Record a target into this Vector, every time step unless sampling options are
+        given.
+
+        :param interval: Sample every ``interval`` ms, with NEURON's ``record(ptr, Dt)``.
+        :type interval: float
+        :param start: Time of the first sample. Requires ``stop``.
+        :type start: float
+        :param stop: Time of the last sample. With ``start`` or ``stop`` the sample times
+          are recorded with NEURON's ``record(ptr, tvec)``.
+        :type stop: float
+        :param reduce: ``"min"``, ``"max"`` or ``"mean"``. Record every time step, and
+          store the reduction of each bin of ``interval`` ms instead. The bins are reduced
+          after each chunk of simulation (see
+          :meth:`~.interpreter.PythonHocInterpreter.add_chunk_hook`), only complete bins
+          are stored.
+        :type reduce: str
+        """
+        options = (interval, start, stop, reduce)
+        if args and any(option is not None for option in options):
+            raise TypeError("Can't combine positional record arguments with options.")
+        if start is not None and stop is None:
+            raise ValueError("`stop` is required when recording from `start`.")
+        if reduce is not None:
+            if reduce not in ("min", "max", "mean"):
+                raise ValueError(f"Unknown reduction '{reduce}'.")
+            if interval is None:
+                raise ValueError("`interval` is required to reduce recordings.")
+            # Record every step into a buffer that is reduced into this Vector.
+            buffer = self._interpreter.Vector()
+            dt = self._interpreter.dt
+            buffer.record(target, dt)
+            self._reducer = _Reducer(self, buffer, reduce, interval, dt, start, stop)
+            self._interpreter._recordings.add(self)
+            return self
+        if stop is not None:
+            import numpy
+
+            step = interval if interval is not None else self._interpreter.dt
+            start = start if start is not None else 0
+            times = numpy.arange(start, stop + step / 2, step)
+            self._record_times = self._interpreter.Vector.from_numpy(times)
+            args = (self._record_times.__neuron__(),)
+        elif interval is not None:
+            args = (interval,)
         nrn_target = transform_record(target)
         with catch_hoc_error(CatchRecord, target=target):
             self.__neuron__().record(nrn_target, *args, **kwargs)
         self.__ref__(target)
+        self._interpreter._recordings.add(self)
         return self
 
+    def as_numpy(self):
+        """
+        Return a NumPy array that is a view on the data of this Vector, without copying.
+
+        The view shares its memory with NEURON, so it is only valid until the Vector is
+        resized. Recording into the Vector resizes it, so obtain a new view after each
+        simulation run. The view keeps this Vector alive.
+
+        :rtype: numpy.ndarray
+        """
+        import numpy
+
+        if not len(self):
+            return numpy.empty(0)
+        return numpy.asarray(_VectorView(self))
+
+
+class _Reducer:
+    """
+    Reduces the samples of a buffer Vector into bins, and appends them to a Vector after
+    every chunk of simulation.
+    """
+
+    _chunk = 100
+
+    def __init__(self, vector, buffer, reduce, interval, dt, start, stop):
+        import numpy
+
+        self._vector = weakref.ref(vector)
+        self._buffer = buffer
+        self._reduce = reduce
+        self._bin = max(1, round(interval / dt))
+        self._first = math.ceil(start / dt - 1e-9) if start is not None else 0
+        self._last = math.floor(stop / dt + 1e-9) if stop is not None else math.inf
+        self._index = 0
+        self._pending = numpy.empty(0)
+        self._interpreter = vector._interpreter
+        # The handler must not hold on to the reducer, or they would keep each other alive.
+        reducer = weakref.ref(self)
+        self._init_handler = self._interpreter.FInitializeHandler(
+            1, lambda: _reset_reducer(reducer)
+        )
+        self._interpreter.add_chunk_hook(self, self._chunk, priority=-1)
+        weakref.finalize(vector, self._release)
+
+    def __call__(self):
+        import numpy
+
+        vector = self._vector()
+        if vector is None:
+            self._release()
+            return
+        data = self._buffer.as_numpy()
+        # Keep the samples within the recording window.
+        lo = max(0, self._first - self._index)
+        hi = max(lo, min(len(data), self._last + 1 - self._index))
+        self._index += len(data)
+        pending = numpy.concatenate((self._pending, data[lo:hi]))
+        self._buffer.__neuron__().resize(0)
+        n = len(pending) // self._bin
+        bins = pending[: n * self._bin].reshape(n, self._bin)
+        self._pending = pending[n * self._bin :].copy()
+        if n:
+            ptr = vector.__neuron__()
+            size = len(ptr)
+            ptr.resize(size + n)
+            vector.as_numpy()[size:] = getattr(bins, self._reduce)(axis=1)
+
+    def _reset(self):
+        import numpy
+
+        vector = self._vector()
+        if vector is not None:
+            vector.__neuron__().resize(0)
+        self._index = 0
+        self._pending = numpy.empty(0)
+
+    def _save(self):
+        return self._index, self._pending.copy()
+
+    def _restore(self, progress):
+        self._index, pending = progress
+        self._pending = pending.copy()
+
+    def _release(self):
+        # Stop recording into the buffer once the reduced Vector is gone.
+        self._interpreter.remove_chunk_hook(self)
+        buffer = self._buffer.__neuron__()
+        buffer.play_remove()
+        buffer.resize(0)
+        self._init_handler = None
+
+
+def _reset_reducer(reducer):
+    reducer = reducer()
+    if reducer is not None:
+        reducer._reset()
+
+
+class Waveform:
+    """
+    Values that are played into variables during the simulation, created with
+    :meth:`~.interpreter.PythonHocInterpreter.waveform`. One Waveform can be played into
+    any number of variables.
+    """
+
+    def __init__(self, values, times, interval, interpolate, duration):
+        self._values = values
+        self._times = times
+        self._interval = interval
+        self._interpolate = interpolate
+        self.duration = duration
+        """
+        Time from the start to the end of the waveform.
+        """
+
+    def __len__(self):
+        """
+        Number of values that NEURON plays, after encoding.
+        """
+        return len(self._values)
+
+    def play(self, target):
+        """
+        Play the waveform into a pointer, e.g. ``clamp._ref_amp``.
+        """
+        values = self._values.__neuron__()
+        if self._times is None:
+            values.play(target, self._interval)
+        else:
+            values.play(target, self._times.__neuron__(), self._interpolate)
+
+
+class Snapshot:
+    """
+    In-memory copy of the state of a simulation, taken with
+    :meth:`~.interpreter.PythonHocInterpreter.snapshot`.
+    """
+
+    def __init__(self, state, t, recordings, reducers):
+        self._state = state
+        self._recordings = recordings
+        self._reducers = reducers
+        self.t = t
+        """
+        Time at which the snapshot was taken.
+        """
+
+    def __repr__(self):
+        return f"<Snapshot of the simulation at t={self.t}>"
+
+
+class _VectorView:
+    """
+    Writable array interface on the data of a Vector. NumPy arrays created from it
+    keep it as their base, and so keep the Vector alive.
+    """
+
+    def __init__(self, vector):
+        self._vector = vector
+        interface = dict(transform(vector).__array_interface__)
+        interface["data"] = (interface["data"][0], False)
+        self.__array_interface__ = interface
+
 
 class IClamp(PythonHocObject):
     def __init__(self, *args, **kwargs):
@@ -528,18 +1078,32 @@ class IClamp(PythonHocObject):
         :type amplitude: Union[float, List[float]]
         """
         if _is_sequence(amplitude):
-            # If its a sequence play it as a vector into the clamp
-            dt = self._interpreter.dt
-            t = self._interpreter.Vector(
-                [self.delay + dt * i for i in range(len(amplitude))]
-            )
-            v = self._interpreter.Vector(amplitude, t)
-            v.play(self._ref_amp, t.__neuron__())
-            self.__ref__(v)
-            self.__ref__(t)
+            self.play(amplitude)
         else:
             self.amp = amplitude
 
+    def play(self, amplitude, sample_interval=None, *, interpolate=False):
+        """
+        Play a waveform into the amplitude, starting at `delay` ms. Clamps that play the
+        same waveform share it, see
+        :meth:`~.interpreter.PythonHocInterpreter.waveform`.
+
+        :param amplitude: The amplitude every `sample_interval` ms.
+        :type amplitude: Union[List[float], numpy.ndarray]
+        :param sample_interval: Time between the values, defaults to ``dt``.
+        :type sample_interval: float
+        :param interpolate: Interpolate linearly between the values, instead of holding
+          each value until the next.
+        :type interpolate: bool
+        :rtype: :class:`.Waveform`
+        """
+        waveform = self._interpreter.waveform(
+            amplitude, sample_interval, delay=self.delay, interpolate=interpolate
+        )
+        waveform.play(self._ref_amp)
+        self.__ref__(waveform)
+        return waveform
+
 
 class SEClamp(PythonHocObject):
     def __init__(self, *args, **kwargs):
@@ -655,6 +1219,48 @@ class SEClamp(PythonHocObject):
         self.amp1 = holding
         self.amp3 = holding
 
+    def play(
+        self, voltage, sample_interval=None, *, before=0, after=0, interpolate=False
+    ):
+        """
+        Play a command waveform into ``amp1``, starting at `before` ms, and clamp at the
+        holding potential before and after it. The durations are set to cover the
+        waveform, and clamps that play the same waveform share it, see
+        :meth:`~.interpreter.PythonHocInterpreter.waveform`.
+
+        :param voltage: The command potential every `sample_interval` ms.
+        :type voltage: Union[List[float], numpy.ndarray]
+        :param sample_interval: Time between the values, defaults to ``dt``.
+        :type sample_interval: float
+        :param before: Duration of the holding interval before the waveform.
+        :type before: float
+        :param after: Duration of the holding interval after the waveform.
+        :type after: float
+        :param interpolate: Interpolate linearly between the values, instead of holding
+          each value until the next.
+        :type interpolate: bool
+        :rtype: :class:`.Waveform`
+        """
+        import numpy
+
+        holding = self.holding
+        # End on the holding potential, which is then held for `after` ms.
+        values = numpy.append(numpy.asarray(voltage, dtype=float), holding)
+        waveform = self._interpreter.waveform(
+            values,
+            sample_interval,
+            delay=before,
+            interpolate=interpolate,
+            initial=holding,
+        )
+        step = sample_interval if sample_interval is not None else self._interpreter.dt
+        self.amp1 = self.amp2 = self.amp3 = holding
+        self.dur1 = before + (len(values) - 1) * step + after
+        self.dur2 = self.dur3 = 0
+        waveform.play(self._ref_amp1)
+        self.__ref__(waveform)
+        return waveform
+
 
 class NetStim(PythonHocObject, Connectable):
     pass
@@ -670,6 +1276,72 @@ class VecStim(PythonHocObject, Connectable):
         return self._pattern.copy()
 
 
+class VecStimCollection:
+    """
+    Compact collection of VecStims created in bulk by
+    :meth:`~.interpreter.PythonHocInterpreter.VecStims`. The collection holds the bare
+    NEURON pointers of the VecStims and of the Vectors they play; the individual
+    :class:`.VecStim` wrappers are only created when indexed.
+    """
+
+    def __init__(self, interpreter, pointers, vectors, spike_times, offsets):
+        self._interpreter = interpreter
+        self._pointers = pointers
+        self._vectors = vectors
+        self._spike_times = spike_times
+        self._offsets = offsets
+        self._references = References()
+
+    def __len__(self):
+        return len(self._pointers)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        item = range(len(self))[item]
+        vec_stim = VecStim(self._interpreter, self._pointers[item])
+        vec_stim._vector = Vector(self._interpreter, self._vectors[item])
+        vec_stim._pattern = self.pattern(item)
+        vec_stim.__ref__(self)
+        return vec_stim
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __neuron__(self):
+        return self._pointers
+
+    def __ref__(self, obj):
+        self._references.add(obj)
+
+    def __deref__(self, obj):
+        return self._references.discard(obj)
+
+    @property
+    def spike_times(self):
+        """
+        Get the spike times of all trains, one train after the other.
+        """
+        return self._spike_times
+
+    @property
+    def offsets(self):
+        """
+        Get the index of the first spike of each train in :attr:`spike_times`, followed
+        by the end of the last train.
+        """
+        return self._offsets
+
+    def pattern(self, index):
+        """
+        Get the spike times of a train.
+
+        :rtype: numpy.ndarray
+        """
+        return self._spike_times[self._offsets[index] : self._offsets[index + 1]]
+
+
 class NetCon(PythonHocObject):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -677,19 +1349,19 @@ class NetCon(PythonHocObject):
 
     def record(self, vector=None):
         if vector is not None:
-            self._neuron_ptr.record(transform(vector))
-            self.recorder = vector
-            if hasattr(vector, "__ref__"):
-                vector.__ref__(self)
+            self._record(vector)
         else:
             if not hasattr(self, "recorder"):
-                vector = self._interpreter.Vector()
-                self._neuron_ptr.record(transform(vector))
-                self.recorder = vector
-                if hasattr(vector, "__ref__"):
-                    vector.__ref__(self)
+                self._record(self._interpreter.Vector())
             return self.recorder
 
+    def _record(self, vector):
+        self._neuron_ptr.record(transform(vector))
+        self.recorder = vector
+        if hasattr(vector, "__ref__"):
+            vector.__ref__(self)
+            self._interpreter._event_recordings.add(vector)
+
     @property
     def threshold(self):
         return transform(self).threshold
@@ -705,6 +1377,173 @@ class NetCon(PythonHocObject):
             transform(self).threshold = value
 
 
+class NetConCollection:
+    """
+    Compact collection of NetCons created in bulk by
+    :meth:`~.interpreter.PythonHocInterpreter.NetCons`. The collection holds the bare
+    NEURON pointers and strong references to all sources and targets; the individual
+    :class:`.NetCon` wrappers are only created when indexed.
+
+    Collections created by :meth:`~.interpreter.ParallelContext.register_cells` and
+    :meth:`~.interpreter.ParallelContext.connect_gids` also hold the GID of each NetCon.
+    """
+
+    def __init__(self, interpreter, pointers, sources, targets, gids=None):
+        self._interpreter = interpreter
+        self._pointers = pointers
+        self._sources = sources
+        self._targets = targets
+        self._gids = gids
+        self._references = References()
+        self._references.add_many(sources)
+        self._references.add_many(targets)
+        self._nothreshold = False
+
+    def __len__(self):
+        return len(self._pointers)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        nc = NetCon(self._interpreter, self._pointers[item])
+        nc._nothreshold = self._nothreshold
+        nc.__ref__(self)
+        return nc
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __neuron__(self):
+        return self._pointers
+
+    @property
+    def sources(self):
+        return self._sources
+
+    @property
+    def targets(self):
+        return self._targets
+
+    @property
+    def gids(self):
+        """
+        Get the GID of each NetCon as an array, or ``None`` for NetCons without GIDs.
+        """
+        return self._gids
+
+    @property
+    def weight(self):
+        """
+        Get the first weight of each NetCon as an array.
+        """
+        import numpy
+
+        return numpy.fromiter((nc.weight[0] for nc in self._pointers), float, len(self))
+
+    @weight.setter
+    def weight(self, weight):
+        weight = _broadcast_values(weight, len(self), "weight")
+        if weight.ndim == 1:
+            for nc, w in zip(self._pointers, weight.tolist()):
+                nc.weight[0] = w
+        else:
+            for nc, ws in zip(self._pointers, weight.tolist()):
+                for i, w in enumerate(ws):
+                    nc.weight[i] = w
+
+    @property
+    def delay(self):
+        """
+        Get the delay of each NetCon as an array.
+        """
+        import numpy
+
+        return numpy.fromiter((nc.delay for nc in self._pointers), float, len(self))
+
+    @delay.setter
+    def delay(self, delay):
+        for nc, d in zip(
+            self._pointers, _broadcast_values(delay, len(self), "delay").tolist()
+        ):
+            nc.delay = d
+
+    @property
+    def threshold(self):
+        """
+        Get the threshold of each NetCon as an array.
+        """
+        import numpy
+
+        return numpy.fromiter((nc.threshold for nc in self._pointers), float, len(self))
+
+    @threshold.setter
+    def threshold(self, threshold):
+        if self._nothreshold:
+            raise RuntimeError(
+                "Do not set threshold on `gid_connect`ed NetCon's. See "
+                "https://github.com/neuronsimulator/nrn/issues/2135 for more information."
+            )
+        thresholds = _broadcast_values(threshold, len(self), "threshold")
+        for nc, t in zip(self._pointers, thresholds.tolist()):
+            nc.threshold = t
+
+
+class _CollectionConnection:
+    """
+    Connection made by a :class:`NetConCollection`, whose :class:`.NetCon` wrapper is
+    only created when the connection is looked up.
+    """
+
+    __slots__ = ("collection", "index")
+
+    def __init__(self, collection, index):
+        self.collection = collection
+        self.index = index
+
+
+def _lookup_connection(a, b):
+    connection = a._connections[b]
+    if isinstance(connection, _CollectionConnection):
+        lazy, connection = connection, connection.collection[connection.index]
+        a._connections[b] = connection
+        if b._connections.get(a) is lazy:
+            b._connections[a] = connection
+    return connection
+
+
+def _broadcast_values(values, n, name="value"):
+    """
+    Broadcast a scalar or per-item sequence of values to a float array of length ``n``.
+    2D arrays are accepted for values like NetCon weights that have multiple entries.
+    """
+    import numpy
+
+    values = numpy.asarray(values, dtype=float)
+    if values.ndim == 0:
+        return numpy.full(n, float(values))
+    if len(values) != n:
+        raise ValueError(f"Expected {n} {name}s, got {len(values)}.")
+    return values
+
+
+def _segment_index(x, nseg):
+    """
+    Return the index of the segment that contains ``x``, -1 and ``nseg`` for the 0 and 1
+    ends of the Section, or ``None`` if ``x`` isn't a position on the Section.
+    """
+    try:
+        if x == 0:
+            return -1
+        if x == 1:
+            return nseg
+        if 0 < x < 1:
+            return min(int(x * nseg), nseg - 1)
+    except TypeError:
+        pass
+    return None
+
+
 class Segment(PythonHocObject, Connectable, WrapsPointers):
     def __init__(self, interpreter, ptr, section, **kwargs):
         super().__init__(interpreter, ptr, **kwargs)
@@ -731,16 +1570,7 @@ class PointProcess(PythonHocObject, Connectable, WrapsPointers):
         :param kwargs: All keyword arguments will be passed set on the
           :class:`NetStim <neuron:NetStim>`
         """
-        from . import connection
-
-        if pattern is None:
-            # No specific pattern given, create NetStim
-            stimulus = self._interpreter.NetStim()
-            for kw, value in kwargs.items():
-                setattr(stimulus.__neuron__(), kw, value)
-        else:
-            # Specific pattern required, create VecStim
-            stimulus = self._interpreter.VecStim(pattern=pattern)
+        stimulus = self._interpreter._stimulus(pattern, **kwargs)
         self._interpreter.NetCon(stimulus, self, weight=weight, delay=delay)
         return stimulus
 
@@ -0,0 +1,162 @@
+"""
+Parameter sweeps over a model that is built once. The model is built in the parent
+process, and forked worker processes inherit it. Each task applies a set of parameters,
+runs the simulation and sends back the recordings that were marked as outputs.
+"""
+
+import os
+from collections.abc import Mapping
+
+from .core import is_section
+
+# Recordings marked as outputs during the build, by name.
+_outputs = {}
+# State of the sweep that the forked workers inherit.
+_sweep = {}
+
+
+def output(recording, name=None):
+    """
+    Mark a recording as an output of the model that is being built for a :func:`sweep`.
+
+    :param recording: The recorded Vector.
+    :param name: Name of the output, defaults to the number of outputs marked so far.
+    :returns: The recording, for chaining.
+    """
+    _outputs[name if name is not None else len(_outputs)] = recording
+    return recording
+
+
+def sweep(build, params, *, duration, workers=None, apply=None, v_init=None):
+    """
+    Build a model once, and run a simulation for every set of parameters in worker
+    processes that are forked from this process. Results are yielded in order of
+    completion.
+
+    By default each set of parameters is a dictionary of dotted paths, relative to the
+    model returned by ``build``, and the values to set. Items of dictionaries and lists
+    can be accessed by key or index. The original values are restored after each task::
+
+      def build():
+          soma = p.Section()
+          soma.insert("hh")
+          output(soma.record(), "v")
+          return {"soma": soma}
+
+      for i, outputs in sweep(build, [{"soma.gnabar_hh": g} for g in gs], duration=100):
+          print(gs[i], outputs["v"].max())
+
+    :param build: Function that builds the model, marks the outputs with :func:`output`
+      and returns the model.
+    :param params: Sequence of parameter sets.
+    :param duration: Duration of each simulation, in ms.
+    :param workers: Number of worker processes. Defaults to the number of CPUs. With 1
+      worker, the tasks are run in this process.
+    :param apply: Function that is called with the model and a parameter set to apply it,
+      instead of the dotted paths. Such changes are not restored after each task.
+    :param v_init: Initial membrane potential of each simulation, defaults to
+      ``p.v_init``.
+    :returns: Iterator of ``(index, outputs)`` tuples, with the index of the parameter
+      set, and a dictionary with a NumPy array of each output.
+    """
+    from . import p
+
+    if p.parallel.nhost() > 1:
+        raise RuntimeError("Sweeps can't be forked from MPI processes.")
+    params = list(params)
+    _outputs.clear()
+    model = build()
+    state = dict(
+        model=model,
+        outputs=dict(_outputs),
+        duration=duration,
+        apply=apply,
+        v_init=v_init,
+        params=params,
+    )
+    _outputs.clear()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return _iter_results(state, range(len(params)), min(workers, max(len(params), 1)))
+
+
+def _iter_results(state, tasks, workers):
+    _sweep.update(state)
+    del state
+    try:
+        if workers == 1:
+            for task in tasks:
+                yield _run_task(task)
+        else:
+            import multiprocessing
+
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                # The workers inherited the model, release it here already, in case the
+                # results aren't iterated to the end.
+                _sweep.clear()
+                yield from pool.imap_unordered(_run_task, tasks)
+    finally:
+        _sweep.clear()
+
+
+def _run_task(index):
+    from . import p
+
+    model = _sweep["model"]
+    params = _sweep["params"][index]
+    if _sweep["apply"] is not None:
+        _sweep["apply"](model, params)
+        originals = []
+    else:
+        originals = [_apply_path(model, path, value) for path, value in params.items()]
+    try:
+        # Without `v_init`, `finitialize` would start from the voltages of the last task.
+        v_init = _sweep["v_init"] if _sweep["v_init"] is not None else p.v_init
+        p.run(_sweep["duration"], v_init=v_init)
+        outputs = {
+            name: recording.as_numpy().copy()
+            for name, recording in _sweep["outputs"].items()
+        }
+    finally:
+        for restore in reversed(originals):
+            restore()
+    return index, outputs
+
+
+def _apply_path(model, path, value):
+    """
+    Set the value at a dotted path, and return a function that restores the original.
+    """
+    *parts, attr = path.split(".")
+    obj = model
+    for part in parts:
+        obj = _get_item(obj, part)
+    if isinstance(obj, Mapping) or (attr.isdigit() and not hasattr(obj, attr)):
+        key = attr if isinstance(obj, Mapping) else int(attr)
+        original = obj[key]
+        obj[key] = value
+        return lambda: obj.__setitem__(key, original)
+    if is_section(obj):
+        # Restore the value of each segment, sections can be inhomogeneous.
+        originals = [getattr(segment, attr) for segment in obj]
+
+        def restore():
+            for segment, original in zip(obj, originals):
+                setattr(segment, attr, original)
+
+    else:
+        original = getattr(obj, attr)
+
+        def restore():
+            setattr(obj, attr, original)
+
+    setattr(obj, attr, value)
+    return restore
+
+
+def _get_item(obj, part):
+    if isinstance(obj, Mapping):
+        return obj[part]
+    if part.isdigit() and not hasattr(obj, part):
+        return obj[int(part)]
+    return getattr(obj, part)
@@ -0,0 +1,182 @@
+"""
+Streaming of recorded Vectors to disk during long simulations, and lazy access to the
+stored traces.
+"""
+
+import json
+from pathlib import Path
+
+from .core import transform
+from .objects import Vector
+
+
+def _index_path(path):
+    return Path(str(path) + ".json")
+
+
+class TraceSink:
+    """
+    Flushes recorded Vectors to a binary file after every chunk of simulated time and
+    empties them, so that long runs don't keep all their samples in memory. Created with
+    :meth:`~.interpreter.PythonHocInterpreter.record_to_disk`.
+
+    The data file contains the float64 samples of each chunk: first the time, then each
+    recording. The offsets of the chunks are stored in a JSON index next to it.
+    """
+
+    def __init__(self, interpreter, path, recordings, chunk):
+        if isinstance(recordings, dict):
+            keys, vectors = list(recordings.keys()), list(recordings.values())
+        else:
+            vectors = list(recordings)
+            keys = list(range(len(vectors)))
+        for vector in vectors:
+            if "_record_times" in getattr(vector, "__dict__", {}):
+                raise ValueError(
+                    "Vectors recorded between `start` and `stop` can't be streamed."
+                )
+        self._interpreter = interpreter
+        self._path = Path(path)
+        self._keys = keys
+        self._time = interpreter.Vector().record(interpreter._ref_t)
+        self._vectors = [
+            v if isinstance(v, Vector) else Vector(interpreter, transform(v))
+            for v in vectors
+        ]
+        self._chunks = []
+        self._offset = 0
+        self._file = open(self._path, "wb")
+        self._write_index()
+        interpreter.add_chunk_hook(self.flush, chunk)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def flush(self):
+        """
+        Append the samples recorded since the last flush to the data file, and empty the
+        Vectors.
+        """
+        import numpy
+
+        vectors = [self._time, *self._vectors]
+        lengths = []
+        for vector in vectors:
+            data = vector.as_numpy()
+            data.tofile(self._file)
+            lengths.append(len(data))
+        time = self._time.as_numpy()
+        self._chunks.append(
+            {
+                "offset": self._offset,
+                "lengths": lengths,
+                "start": float(time[0]) if len(time) else None,
+                "stop": float(time[-1]) if len(time) else None,
+            }
+        )
+        self._offset += numpy.dtype(float).itemsize * sum(lengths)
+        for vector in vectors:
+            transform(vector).resize(0)
+        self._file.flush()
+        self._write_index()
+
+    def close(self):
+        """
+        Stop streaming, flush any remaining samples and return the stored traces.
+
+        :rtype: :class:`Traces`
+        """
+        if not self.closed:
+            self._interpreter.remove_chunk_hook(self.flush)
+            if any(len(v) for v in (self._time, *self._vectors)):
+                self.flush()
+            self._file.close()
+        return Traces(self._path)
+
+    def _write_index(self):
+        with open(_index_path(self._path), "w") as f:
+            json.dump({"keys": self._keys, "chunks": self._chunks}, f)
+
+
+class Traces:
+    """
+    Traces written by a :class:`TraceSink`, loaded lazily from disk. Index with the key of
+    a recording to load its full trace, or use :meth:`window` to only read the chunks
+    that overlap with a time window.
+    """
+
+    def __init__(self, path):
+        import numpy
+
+        self._path = Path(path)
+        with open(_index_path(self._path), "r") as f:
+            index = json.load(f)
+        self._keys = index["keys"]
+        self._chunks = index["chunks"]
+        if self._path.stat().st_size:
+            self._data = numpy.memmap(self._path, dtype=float, mode="r")
+        else:
+            self._data = numpy.empty(0)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __getitem__(self, key):
+        return self._read(self._column(key), self._chunks)
+
+    def keys(self):
+        return list(self._keys)
+
+    @property
+    def time(self):
+        """
+        Time of every sample.
+        """
+        return self._read(0, self._chunks)
+
+    def window(self, key, start, stop):
+        """
+        Read the samples of a recording with ``start <= t < stop``.
+
+        :returns: The time and the value of each sample in the window.
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        column = self._column(key)
+        chunks = [
+            c
+            for c in self._chunks
+            if c["start"] is not None and c["start"] < stop and c["stop"] >= start
+        ]
+        if any(c["lengths"][column] != c["lengths"][0] for c in chunks):
+            raise ValueError(f"Recording '{key}' is not sampled at the simulation time.")
+        time = self._read(0, chunks)
+        values = self._read(column, chunks)
+        mask = (time >= start) & (time < stop)
+        return time[mask], values[mask]
+
+    def _column(self, key):
+        try:
+            return self._keys.index(key) + 1
+        except ValueError:
+            raise KeyError(key) from None
+
+    def _read(self, column, chunks):
+        import numpy
+
+        itemsize = numpy.dtype(float).itemsize
+        blocks = []
+        for chunk in chunks:
+            lengths = chunk["lengths"]
+            start = chunk["offset"] // itemsize + sum(lengths[:column])
+            blocks.append(self._data[start : start + lengths[column]])
+        return numpy.concatenate(blocks) if blocks else numpy.empty(0)
@@ -1,3 +1,5 @@
+import sys
+
 import _shared
 from neuron import h
 
@@ -82,3 +84,22 @@ class TestErrorHandling(_shared.NeuronTestCase):
         with self.assertRaises(ErrorHandlingError):
             with catch_hoc_error(NoCatchHandler):
                 h.NetCon(5, 12)
+
+    def test_error_scope(self):
+        import contextlib
+        import io
+
+        s = p.Section()
+        t = p.Vector()
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            with p.error_scope():
+                print("passed through")
+                with self.assertRaises(HocConnectError, msg="Didn't catch NetCon error"):
+                    p.NetCon(s, t)
+                with p.error_scope():
+                    with self.assertRaises(HocRecordError, msg="Nested scope failed"):
+                        p.record(4)
+                v = p.record(s)
+            self.assertIs(out, sys.stdout, "Scope did not restore stdout")
+        self.assertEqual("passed through\n", out.getvalue(), "Scope captured output")
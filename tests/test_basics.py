@@ -1,10 +1,12 @@
+import gc
 import unittest
+import weakref
 
 import _shared
 
 import patch.objects
 from patch import is_density_mechanism, is_point_process, p
-from patch.exceptions import HocRecordError
+from patch.exceptions import HocRecordError, UninitializedError
 
 
 class TestPatchRegistration(_shared.NeuronTestCase):
@@ -39,6 +41,182 @@ class TestSimulationControl(_shared.NeuronTestCase):
         p.run(10)
         self.assertAlmostEqual(10, p.t)
 
+    def test_record_sampling(self):
+        import numpy as np
+
+        s = p.Section()
+        s.insert("hh")
+        s.iclamp(amplitude=0.3, delay=5, duration=100)
+        full = s.record()
+        decimated = s.record(interval=1)
+        window = p.record(s(0.5), interval=0.5, start=10, stop=20)
+        mean = s.record(reduce="mean", interval=1)
+        peak = s.record(reduce="max", interval=1, start=10, stop=20)
+        with self.assertRaises(ValueError):
+            s.record(start=10)
+        with self.assertRaises(ValueError):
+            s.record(reduce="median", interval=1)
+        p.finitialize(-65)
+        p.continuerun(50)
+        f = full.as_numpy()
+        k = round(1 / p.dt)
+        self.assertTrue(np.allclose(f[::k], decimated.as_numpy()), "Wrong interval")
+        self.assertTrue(
+            np.allclose(f[10 * k : 20 * k + 1 : k // 2], window.as_numpy()),
+            "Wrong window",
+        )
+        self.assertTrue(
+            np.allclose(f[: 50 * k].reshape(50, k).mean(axis=1), mean.as_numpy()),
+            "Wrong means",
+        )
+        self.assertTrue(
+            np.allclose(f[10 * k : 20 * k].reshape(10, k).max(axis=1), peak.as_numpy()),
+            "Wrong maxima",
+        )
+        p.finitialize(-65)
+        p.continuerun(50)
+        self.assertEqual(50, len(mean), "Reduced recording not reset")
+        reducer = weakref.ref(mean._reducer)
+        buffer = mean._reducer._buffer
+        del mean
+        gc.collect()
+        p.finitialize(-65)
+        p.continuerun(50)
+        self.assertEqual(0, len(buffer), "Buffer of deleted reduction still recording")
+        self.assertIsNone(reducer(), "Reducer not released")
+
+    def test_state(self):
+        import numpy as np
+
+        s = p.Section()
+        s.nseg = 3
+        s.insert("hh")
+        s2 = p.Section()
+        s2.insert("pas")
+        p.finitialize(-65)
+        index = p.state_index()
+        self.assertIsNotNone(p._state_index, "Index not cached")
+        self.assertEqual(
+            [(sec.__neuron__(), x) for sec, x in index],
+            [(sec.__neuron__(), x) for sec, x in p.state_index()],
+            "Cached index differs",
+        )
+        mine = [i for i, (sec, _) in enumerate(index) if sec in (s, s2)]
+        self.assertEqual([1 / 6, 0.5, 5 / 6, 0.5], [index[i][1] for i in mine])
+        state = p.state(("v", "m_hh"))
+        m = state["m_hh"][mine]
+        self.assertTrue(np.isnan(m[3]), "Missing mechanism not NaN")
+        self.assertAlmostEqual(s(0.5).m_hh, m[1])
+        p.continuerun(5)
+        self.assertFalse(np.allclose(state["v"], p.state()["v"]), "State didn't change")
+        p.set_state(state)
+        self.assertEqual(-65, s(0.5).v, "State not restored")
+        self.assertTrue(np.array_equal(m, p.state(("m_hh",))["m_hh"][mine], True))
+        with self.assertRaises(AttributeError):
+            p.state(("foo",))
+        ref = weakref.ref(s2)
+        del s2, index, mine
+        gc.collect()
+        self.assertIsNone(ref(), "State index keeps sections alive")
+
+    def test_time(self):
+        import numpy as np
+
+        s = p.Section()
+        full = s.record()
+        decimated = s.record(interval=0.33)
+        window = s.record(interval=0.5, start=2, stop=7)
+        p.run(10)
+        self.assertIs(p.time, p.time, "Time not shared")
+        self.assertEqual(len(full), len(p.time), "Time not recorded")
+        t = p.time.as_numpy()
+        self.assertTrue(np.shares_memory(t, p.sample_times(0.5)), "Time copied")
+        self.assertTrue(np.allclose(np.arange(2, 7.25, 0.5), p.sample_times(0.5, 2, 7)))
+        self.assertEqual(len(window), len(p.sample_times(0.5, 2, 7)), "Wrong window")
+        self.assertEqual(len(decimated), len(p.sample_times(0.33)), "Wrong interval")
+        self.assertIs(p.sample_times(0.33), p.sample_times(0.33), "Times not cached")
+        p.run(5)
+        self.assertAlmostEqual(5, p.time.as_numpy()[-1], msg="Time not resized")
+        self.assertAlmostEqual(4.95, p.sample_times(0.33)[-1], msg="Stale times")
+
+    def test_time_section(self):
+        dud = p._PythonHocInterpreter__dud_section
+        s = p.Section()
+        s.record()
+        p.run(1)
+        if dud is None:
+            self.assertIsNone(p._PythonHocInterpreter__dud_section, "Section created")
+        # Delete the section that the time is recorded alongside.
+        del s
+        gc.collect()
+        s = p.Section()
+        v = s.record()
+        p.run(2)
+        self.assertEqual(len(v), len(p.time), "Time not recorded after section deletion")
+        self.assertAlmostEqual(2, p.time.as_numpy()[-1], msg="Time not recorded")
+
+    def test_snapshot(self):
+        s = p.Section()
+        s.L = s.diam = 10
+        s.insert("hh")
+        syn = p.ExpSyn(s(0.5))
+        stimulus = syn.stimulate(pattern=[1, 6, 11, 16, 21, 26, 31, 36])
+        v = s.record()
+        spikes = p.NetCon(s, None).record()
+        gid = 4000 + p.parallel.id()
+        p.parallel.set_gid2node(gid, p.parallel.id())
+        self.addCleanup(p.parallel.gid_clear)
+        p.parallel.cell(gid, p.NetCon(stimulus, None))
+        spike_times, spike_gids = p.parallel.spike_record(gid)
+        p.finitialize(-65)
+        p.continuerun(20)
+        snap = p.snapshot()
+        self.assertAlmostEqual(20, snap.t)
+        p.continuerun(20)
+        reference = list(v)
+        reference_spikes = list(spikes)
+        reference_times = list(spike_times)
+        self.assertTrue(any(t > 20 for t in reference_spikes), "No spikes to truncate")
+        for _ in range(2):
+            p.restore(snap)
+            self.assertAlmostEqual(20, p.t, msg="Time not restored")
+            p.run(40, reset=False)
+            self.assertEqual(reference, list(v), "Restored run differs")
+            self.assertEqual(reference_spikes, list(spikes), "NetCon spikes differ")
+            self.assertEqual(reference_times, list(spike_times), "Spike record differs")
+            self.assertEqual(len(spike_times), len(spike_gids), "Spike gids differ")
+        p.restore(snap, recordings="keep")
+        self.assertEqual(len(reference), len(v), "Recordings not kept")
+        with self.assertRaises(ValueError):
+            p.restore(snap, recordings="drop")
+        p._finitialized = False
+        with self.assertRaises(UninitializedError):
+            p.snapshot()
+        p._finitialized = True
+
+    def test_snapshot_reduced(self):
+        import numpy as np
+
+        s = p.Section()
+        s.L = s.diam = 10
+        s.insert("hh")
+        syn = p.ExpSyn(s(0.5))
+        syn.stimulate(pattern=[1, 6, 11, 16, 21, 26, 31, 36])
+        mean = s.record(interval=1, reduce="mean")
+        p.finitialize(-65)
+        # Snapshot in the middle of a bin and of a chunk.
+        p.continuerun(20.5)
+        snap = p.snapshot()
+        p.continuerun(19.5)
+        reference = mean.as_numpy().copy()
+        self.assertEqual(40, len(reference))
+        for _ in range(2):
+            p.restore(snap)
+            p.continuerun(19.5)
+            self.assertTrue(
+                np.allclose(reference, mean.as_numpy()), "Restored reduction differs"
+            )
+
 
 @unittest.skipIf(
     p.parallel.nhost() != 1, "Avoid NEURON throwing MPI_ABORTs for weird tests"
@@ -221,6 +399,30 @@ class TestSection(_shared.NeuronTestCase):
             "Section call did not return a NEURON Segment pointer",
         )
 
+    def test_segment_interning(self):
+        s = p.Section()
+        s.nseg = 5
+        seg = s(0.5)
+        for _ in range(100):
+            self.assertIs(seg, s(0.5), "Segment not interned")
+            self.assertEqual(0.45, s(0.45).x, "Position not kept")
+        self.assertEqual(1, len(s._references), "References grew")
+        self.assertIs(seg._references, s(0.45)._references, "References not shared")
+        self.assertIs(seg, s(0.5, ephemeral=True), "Interned segment not returned")
+        self.assertIsNot(s(0.7, ephemeral=True), s(0.7, ephemeral=True))
+        self.assertIs(seg, list(s)[2], "Iteration didn't return interned segment")
+        self.assertIsNot(s(0), s(0.01), "Ends not separate")
+        self.assertEqual(1, s(1).x)
+        syn = p.ExpSyn(s(0.5))
+        del syn
+        s.nseg = 3
+        self.assertIsNot(seg, s(0.5), "Stale segment returned")
+        self.assertNotIn(seg, list(s._references), "Stale segment kept")
+        self.assertTrue(
+            any(type(r).__name__ == "PointProcess" for r in s._references),
+            "Point process of stale segment not kept alive",
+        )
+
     def test_section_attr(self):
         transform = patch.transform
         s = p.Section()
@@ -249,6 +451,107 @@ class TestSection(_shared.NeuronTestCase):
             "Wholetree diff",
         )
 
+    def test_build_morphology(self):
+        import numpy as np
+
+        points = np.arange(18, dtype=float).reshape(6, 3)
+        section_index = [0, 0, 1, 1, 2, 2]
+        sections = p.build_morphology(
+            points, [1, 2, 3, 4, 5, 6], section_index, [-1, 0, 0]
+        )
+        self.assertEqual(3, len(sections), "Expected 3 sections")
+        self.assertEqual(patch.objects.Section, type(sections[0]), "Expected Sections")
+        self.assertEqual(2, sections[1].n3d(), "Points not added")
+        self.assertEqual(
+            (9.0, 10.0, 11.0, 4.0),
+            (
+                sections[1].x3d(1),
+                sections[1].y3d(1),
+                sections[1].z3d(1),
+                sections[1].diam3d(1),
+            ),
+            "Points added incorrectly",
+        )
+        self.assertEqual(2, len(sections[0].children()), "Sections not connected")
+        self.assertIn(sections[0], sections[2]._references, "Child should ref parent")
+        with self.assertRaises(ValueError):
+            p.build_morphology(points, 1, section_index, [-1, 0])
+
+    def test_geometry(self):
+        import numpy as np
+
+        s = p.Section()
+        s.add_3d([[0, 0, 0], [10, 0, 0], [10, 10, 0]], diameters=[1, 2, 3])
+        s.nseg = 4
+        s2 = p.Section()
+        geo = p.geometry([s, s2])
+        self.assertEqual([0, 3, 3], list(geo.point_offsets), "Wrong point offsets")
+        self.assertEqual([0, 4, 5], list(geo.segment_offsets), "Wrong segment offsets")
+        self.assertEqual([1, 2, 3], list(geo.diam), "Wrong diameters")
+        self.assertEqual([0, 10, 20], list(geo.arc), "Wrong arc lengths")
+        self.assertTrue(np.allclose([2.5, 0, 0], geo.segments(0)[0]), "Wrong midpoint")
+        self.assertTrue(np.allclose([10, 7.5, 0], geo.segments(0)[3]), "Wrong midpoint")
+        self.assertTrue(np.isnan(geo.segments(1)).all(), "Midpoints without 3D points")
+        self.assertTrue(np.array_equal(geo.points(0), s.points), "Points differ")
+        p.finitialize()
+        p.geometry([s])
+        self.assertIn(hash(s.__neuron__()), p._geometry_cache, "Geometry not cached")
+        s.add_3d([[10, 20, 0]])
+        self.assertEqual(4, len(p.geometry([s]).xyz), "Cache not invalidated")
+
+    def test_range_variables(self):
+        import numpy as np
+
+        s = p.Section()
+        s.nseg = 4
+        s.insert("hh")
+        s2 = p.Section()
+        s2.insert("hh")
+        s.set("gnabar_hh", lambda x: x)
+        self.assertEqual([0.125, 0.375, 0.625, 0.875], [seg.gnabar_hh for seg in s])
+        p.finitialize()
+        p.set([s, s2], "gnabar_hh", np.arange(5))
+        self.assertEqual([0, 1, 2, 3, 4], list(p.get([s, s2], "gnabar_hh")))
+        self.assertEqual(1, len(p._range_cache), "Pointers not cached")
+        s2.set("gkbar_hh", 2)
+        self.assertEqual(2, s2(0.5).gkbar_hh, "Scalar not set")
+        s.set("diam", 3)
+        p.finitialize()
+        self.assertEqual(3, s(0.5).diam, "Diameter not set")
+        s.nseg = 2
+        self.assertEqual(2, len(s.get("gnabar_hh")), "Pointers not invalidated")
+        with self.assertRaises(AttributeError):
+            s.get("foo")
+
+    def test_range_variables_hoc_sections(self):
+        from neuron import h
+
+        # Deleted HOC sections leave names behind that error on access, so keep them.
+        h("create range_soma, range_dend")
+        p.finitialize()
+        h.range_soma.v = 11
+        h.range_dend.v = 22
+        self.assertEqual([11], list(p.get(h.range_soma, "v")))
+        self.assertEqual([22], list(p.get(h.range_dend, "v")), "Other section read")
+        p.set(h.range_dend, "v", 33)
+        self.assertEqual(11, h.range_soma(0.5).v, "Other section written")
+        self.assertEqual(33, h.range_dend(0.5).v, "Section not written")
+
+    def test_geometry_hoc_sections(self):
+        from neuron import h
+
+        # Deleted HOC sections leave names behind that error on access, so keep them.
+        h("create geometry_soma, geometry_dend")
+        h.pt3dadd(0, 0, 0, 1, sec=h.geometry_soma)
+        h.pt3dadd(1, 0, 0, 1, sec=h.geometry_soma)
+        h.pt3dadd(0, 5, 0, 1, sec=h.geometry_dend)
+        h.pt3dadd(0, 9, 0, 1, sec=h.geometry_dend)
+        p.finitialize()
+        self.assertEqual([1, 0, 0], list(p.geometry([h.geometry_soma]).xyz[1]))
+        self.assertEqual(
+            [0, 9, 0], list(p.geometry([h.geometry_dend]).xyz[1]), "Other section read"
+        )
+
     def test_record_access(self):
         s = p.Section()
         r = s.record(0.5)
@@ -311,6 +614,28 @@ class TestSection(_shared.NeuronTestCase):
         self.assertIn(syn, s.synapses, "Synapse product not found in synapse collection.")
 
 
+class TestVector(_shared.NeuronTestCase):
+    def test_numpy(self):
+        import numpy as np
+
+        arr = np.linspace(0, 1, 100)
+        v = p.Vector.from_numpy(arr)
+        self.assertEqual(patch.objects.Vector, type(v), "from_numpy should give Vector")
+        self.assertTrue(np.array_equal(arr, v.as_numpy()), "bulk fill mismatch")
+        view = v.as_numpy()
+        view[0] = 5
+        self.assertEqual(5, v.x[0], "as_numpy should be a view on the Vector data")
+        self.assertEqual(
+            patch.objects.Vector, type(p.Vector(arr)), "Vector(ndarray) should wrap"
+        )
+        self.assertTrue(np.array_equal(arr, p.Vector(arr).as_numpy()), "Vector(ndarray)")
+        self.assertEqual([1.0, 2.0], list(p.Vector([1, 2])), "Vector(list) broken")
+        s = p.Section()
+        r = p.Vector().record(s)
+        p.run(1)
+        self.assertTrue(np.array_equal(list(r), r.as_numpy()), "record view mismatch")
+
+
 class TestSectionRef(_shared.NeuronTestCase):
     def test_ref(self):
         s = p.Section()
@@ -382,6 +707,17 @@ class TestPointProcess(_shared.NeuronTestCase):
             "Point process factory did not return a NEURON point process pointer.",
         )
 
+    def test_lazy_wrapping(self):
+        from patch.interpreter import PythonHocInterpreter
+
+        self.assertNotIn("OClamp", vars(PythonHocInterpreter), "Wrapped eagerly")
+        pp = p.OClamp(p.Section()(0.5))
+        self.assertEqual(patch.objects.PointProcess, type(pp), "Not wrapped")
+        self.assertIn("OClamp", vars(PythonHocInterpreter), "Wrapper not stored")
+        self.assertEqual("OClamp", PythonHocInterpreter.OClamp.__code__.co_name)
+        self.assertIsNot(p.dt, None)
+        self.assertFalse(p._is_point_process("dt"), "Wrong classification")
+
     def test_stimulate(self):
         s = p.Section()
         pp = p.ExpSyn(s(0.5))
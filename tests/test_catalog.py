@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import _shared
+
+from patch import p
+from patch.catalog import MechanismCatalog, catalog
+
+
+class TestCatalog(_shared.NeuronTestCase):
+    """
+    Test the on-disk catalog of pointer parameters.
+    """
+
+    def setUp(self):
+        # Keep the tests out of the user's cache.
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        env = mock.patch.dict(os.environ, {"PATCH_CACHE_DIR": cache.name})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(catalog.flush)
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as d:
+            catalog = MechanismCatalog(d)
+            self.assertIsNone(catalog.get("ExpSyn"), "Empty catalog should miss")
+            catalog.add("ExpSyn", ["e", "g", "i", "tau"])
+            self.assertIsNone(MechanismCatalog(d).get("ExpSyn"), "Written before flush")
+            catalog.flush()
+            self.assertEqual(
+                ["e", "g", "i", "tau"],
+                MechanismCatalog(d).get("ExpSyn"),
+                "Catalog not read back from disk",
+            )
+
+    def test_library_invalidation(self):
+        with tempfile.TemporaryDirectory() as d:
+            catalog = MechanismCatalog(d)
+            catalog.add("ExpSyn", ["e"])
+            lib = os.path.join(d, "libnrnmech.so")
+            with open(lib, "w") as f:
+                f.write("v1")
+            catalog.add_library(lib)
+            self.assertIsNone(catalog.get("ExpSyn"), "New library should switch catalog")
+            catalog.add("ExpSyn", ["e", "g"])
+            with open(lib, "w") as f:
+                f.write("rebuilt")
+            rebuilt = MechanismCatalog(d)
+            rebuilt.add_library(lib)
+            self.assertIsNone(rebuilt.get("ExpSyn"), "Rebuilt library should invalidate")
+
+    def test_mechanism_invalidation(self):
+        with tempfile.TemporaryDirectory() as d:
+            catalog = MechanismCatalog(d)
+            catalog.add("ExpSyn", ["e"])
+            catalog.flush()
+            new = ["pas", "hh", "new"]
+            with mock.patch("patch.catalog._mechanisms", return_value=new) as mechanisms:
+                other = MechanismCatalog(d)
+                self.assertIsNone(other.get("ExpSyn"), "New mechanism should switch")
+                other.add("ExpSyn", ["e", "g"])
+                other.get("ExpSyn")
+                self.assertEqual(1, mechanisms.call_count, "Key not cached")
+
+    @unittest.skipIf(os.name != "posix", "POSIX file permissions")
+    def test_permissions(self):
+        catalog.add("ExpSyn", ["e"])
+        catalog.flush()
+        umask = os.umask(0o022)
+        os.umask(umask)
+        self.assertEqual(0o666 & ~umask, catalog.path.stat().st_mode & 0o777)
+
+    def test_wrapping(self):
+        from patch.objects import PointerWrapper
+
+        syn = p.Section().synapse(p.AlphaSynapse)
+        self.assertIn("gmax", syn.parameters, "Parameters not found")
+        self.assertIs(PointerWrapper, type(type(syn).__dict__["gmax"]), "Not wrapped")
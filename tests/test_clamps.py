@@ -64,6 +64,58 @@ class TestClamps(_shared.NeuronTestCase):
             "No negative injected current detected",
         )
 
+    def test_iclamp_waveform(self):
+        import numpy as np
+
+        noise = np.random.default_rng(0).normal(0, 0.1, 400)
+        c1 = p.Section().iclamp(noise)
+        c2 = p.Section().iclamp(noise)
+        self.assertAlmostEqual(400 * p.dt, c1.duration, msg="Duration not set")
+        waveform = p.waveform(noise)
+        self.assertIn(waveform, list(c1._references), "Waveform not shared")
+        self.assertIn(waveform, list(c2._references), "Waveform not shared")
+        steps = np.repeat([0.0, 0.5, 0.0], 200)
+        c3 = p.Section().iclamp(steps, delay=2, sample_interval=0.1)
+        self.assertEqual(3, len(p.waveform(steps, 0.1, delay=2)), "Steps not compact")
+        self.assertAlmostEqual(60, c3.duration, msg="Wrong duration")
+        r1 = p.record(c1._ref_amp)
+        r2 = p.record(c2._ref_amp)
+        r3 = p.record(c3._ref_amp)
+        p.finitialize()
+        p.continuerun(65)
+        # Recordings lag 1 step behind the played values.
+        self.assertTrue(np.allclose(noise, r1.as_numpy()[1:401]), "Noise not played")
+        self.assertTrue(np.array_equal(r1.as_numpy(), r2.as_numpy()), "Shared play")
+        amp = r3.as_numpy()[1:]
+        t = p.time.as_numpy()[:-1]
+        self.assertTrue(np.all(amp[(t >= 22) & (t < 41.9)] == 0.5), "Step not played")
+        self.assertTrue(np.all(amp[t >= 42] == 0), "Step not ended")
+
+    def test_waveform_delay(self):
+        import numpy as np
+
+        clamps = [p.IClamp(sec=p.Section()) for _ in range(3)]
+        for clamp in clamps:
+            clamp.amp = -99
+        waveforms = [
+            p.waveform([5, 5, 5, 6], 1, delay=3),
+            p.waveform([5, 6], 1, delay=3, interpolate=True),
+            p.waveform([5, 6], 1, delay=3, initial=0),
+        ]
+        for waveform, clamp in zip(waveforms, clamps):
+            waveform.play(clamp._ref_amp)
+        recordings = [p.record(clamp._ref_amp) for clamp in clamps]
+        p.finitialize()
+        p.continuerun(5)
+        # Recordings lag 1 step behind the played values.
+        t = p.time.as_numpy()[:-1]
+        held, ramp, lead = (r.as_numpy()[1:] for r in recordings)
+        self.assertTrue(np.all(held[t < 2.9] == -99), "Changed before delay")
+        self.assertTrue(np.all(ramp[t < 2.9] == -99), "Changed before delay")
+        self.assertTrue(np.all(lead[t < 2.9] == 0), "Initial value not played")
+        self.assertEqual(5, held[np.searchsorted(t, 3.5)], "Waveform not played")
+        self.assertAlmostEqual(5.5, ramp[np.searchsorted(t, 3.5)], msg="Not interpolated")
+
     def test_seclamp(self):
         clamp = p.SEClamp(p.Section())
         self.assertEqual(100, clamp.delay, "default delay should be 100")
@@ -76,3 +128,27 @@ class TestClamps(_shared.NeuronTestCase):
         clamp.after = 102
         self.assertEqual(102, clamp.__neuron__().dur3, "after setting failed")
         self.assertEqual(102, clamp.after, "duration get failed")
+
+    def test_seclamp_waveform(self):
+        import numpy as np
+
+        ramp = np.linspace(-70, 0, 400)
+        sections = [p.Section() for _ in range(3)]
+        clamps = [s.vclamp(ramp, sample_interval=0.025, before=5) for s in sections]
+        self.assertEqual(15, clamps[0].dur1, "Durations not set")
+        self.assertEqual(0, clamps[0].dur2 + clamps[0].dur3, "Durations not set")
+        waveform = p.waveform(np.append(ramp, -70), 0.025, delay=5, initial=-70)
+        for clamp in clamps:
+            self.assertIn(waveform, list(clamp._references), "Waveform not shared")
+        steps = sections[0].vclamp([-70, -20, -70], before=10, duration=10, after=10)
+        self.assertEqual([-70, -20, -70], steps.voltage, "3 values not mapped on steps")
+        r = p.record(clamps[0]._ref_amp1)
+        v = sections[1].record()
+        for _ in range(2):
+            p.finitialize(-65)
+            p.continuerun(20)
+            t = p.time.as_numpy()
+            amp = r.as_numpy()
+            self.assertTrue(np.all(amp[t < 4.9] == -70), "Not holding before")
+            self.assertAlmostEqual(ramp[-1], amp[(t > 14.9) & (t < 15)][0], delta=1)
+            self.assertGreater(v.as_numpy()[np.searchsorted(t, 10)], -55, "Not clamped")
@@ -0,0 +1,49 @@
+import _shared
+
+import patch.core
+from patch import instrumentation, p
+
+
+class TestInstrumentation(_shared.NeuronTestCase):
+    """
+    Test the instrumentation of the hot paths.
+    """
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+        super().tearDown()
+
+    def test_instrumentation(self):
+        original = patch.core.transform
+        instrumentation.enable()
+        self.assertTrue(instrumentation.is_enabled())
+        self.assertIsNot(original, patch.core.transform, "transform not instrumented")
+        s = p.Section()
+        syn = s.synapse(p.ExpSyn)
+        p.NetCon(p.NetStim(), syn)
+        p.Vector().record(s(0.5))
+        instrumentation.disable()
+        self.assertIs(original, patch.core.transform, "transform not restored")
+        totals = {row["name"]: row for row in instrumentation.report(False)}
+        for name in (
+            "transform",
+            "catch_hoc_error",
+            "PythonHocObject.__ref__",
+            "PythonHocInterpreter.NetCon",
+            "PythonHocInterpreter.Section",
+            "PythonHocInterpreter.Vector",
+        ):
+            self.assertIn(name, totals, f"{name} not instrumented")
+            self.assertGreater(totals[name]["calls"], 0, f"{name} not counted")
+        self.assertEqual(2, totals["catch_hoc_error"]["calls"], "Wrong call count")
+        sites = {
+            row["call_site"]
+            for row in instrumentation.report()
+            if row["name"] == "catch_hoc_error"
+        }
+        self.assertEqual(
+            {"patch.interpreter.NetCon", "patch.objects.record"}, sites, "Wrong sites"
+        )
+        instrumentation.reset()
+        self.assertEqual([], instrumentation.report(), "Statistics not reset")
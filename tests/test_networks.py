@@ -1,3 +1,4 @@
+import unittest
 from random import random
 
 import _shared
@@ -78,3 +79,103 @@ class TestNetworks(_shared.NeuronTestCase):
         self.assertEqual(
             len(v), len(v2), "Different NetCon recorders should record same spikes."
         )
+
+    def test_bulk_netcons(self):
+        import numpy as np
+
+        from patch.objects import NetConCollection
+
+        stim = p.NetStim()
+        stim.start = 1
+        stim.number = 1
+        sections = [p.Section() for _ in range(5)]
+        syns = [p.ExpSyn(s) for s in sections]
+        recs = [s.record() for s in sections]
+        weights = np.linspace(0.01, 0.05, 5)
+        ncs = p.NetCons(stim, syns, weight=weights, delay=np.arange(1, 6))
+        self.assertEqual(NetConCollection, type(ncs), "expected compact collection")
+        self.assertEqual(5, len(ncs), "expected 1 NetCon per target")
+        self.assertTrue(np.allclose(weights, ncs.weight), "weights not set")
+        self.assertTrue(np.allclose(np.arange(1, 6), ncs.delay), "delays not set")
+        self.assertEqual(NetCon, type(ncs[0]), "indexing should wrap the NetCon")
+        self.assertIn(ncs, stim._references, "source should reference collection")
+        self.assertIn(ncs, syns[0]._references, "target should reference collection")
+        self.assertIn(syns[4], ncs.targets, "collection should reference targets")
+        self.assertNotIsInstance(
+            stim._connections[syns[2]], NetCon, "Connections should be wrapped lazily"
+        )
+        nc = connection(stim, syns[2])
+        self.assertIs(ncs.__neuron__()[2], nc.__neuron__(), "Connection not registered")
+        self.assertIs(nc, connection(syns[2], stim, strict=False))
+        self.assertIs(nc, connection(stim, syns[2]), "Wrapper not reused")
+        detectors = p.NetCons(sections, None, threshold=-30)
+        self.assertTrue(np.allclose(-30, detectors.threshold), "thresholds not set")
+        with self.assertRaises(ValueError):
+            p.NetCons(sections, syns[:2])
+
+        p.finitialize()
+        p.continuerun(10)
+        peaks = [max(r) for r in recs]
+        self.assertEqual(sorted(peaks), peaks, "higher weights should give higher peaks")
+
+    def test_shared_stimulus(self):
+        import numpy as np
+
+        sections = [p.Section() for _ in range(5)]
+        syns = [p.ExpSyn(s) for s in sections]
+        recs = [s.record() for s in sections]
+        weights = np.linspace(0.01, 0.05, 5)
+        ncs = p.stimulate(syns, start=1, number=1, weight=weights, delay=[1, 1, 1, 1, 2])
+        self.assertEqual(1, len(ncs.sources), "Stimulus not shared")
+        self.assertEqual("NetStim", ncs.sources[0].hname().split("[")[0])
+        self.assertEqual(1, ncs.sources[0].number, "NetStim not configured")
+        self.assertTrue(np.allclose(weights, ncs.weight), "Weights not set")
+        nc = connection(ncs.sources[0], syns[4])
+        self.assertAlmostEqual(0.05, nc.weight[0], msg="Connection not registered")
+        pattern = p.stimulate(syns[0], pattern=[5])
+        self.assertEqual(1, len(pattern), "Single point process not stimulated")
+        p.finitialize()
+        p.continuerun(10)
+        t = p.time.as_numpy()
+        peaks = [r.as_numpy()[t < 5].max() for r in recs[:4]]
+        self.assertEqual(sorted(peaks), peaks, "Higher weights should give higher peaks")
+        first = [np.argmax(r.as_numpy() > -65 + 1e-3) for r in recs]
+        self.assertLess(t[first[3]], t[first[4]], "Delays not set")
+        self.assertGreater(recs[0].as_numpy()[t > 6].max(), -64.9, "Pattern not played")
+
+    def test_vecstims(self):
+        import gc
+
+        import numpy as np
+
+        from patch.objects import VecStim
+
+        vs = p.VecStim(pattern=[1, 2])
+        self.assertEqual([1, 2], vs.pattern, "Pattern not stored on the VecStim")
+        self.assertNotIn("_pattern", vars(p), "Pattern stored on the interpreter")
+        stims = p.VecStims(np.array([1, 5, 2, 3, 4]), [0, 2, 2, 5])
+        self.assertEqual(3, len(stims), "Expected 1 VecStim per train")
+        self.assertEqual(VecStim, type(stims[-1]), "Indexing should wrap the VecStim")
+        self.assertEqual([2, 3, 4], list(stims[2].pattern), "Wrong train")
+        self.assertEqual([2, 3, 4], list(stims[2].vector), "Wrong Vector")
+        self.assertEqual(0, len(stims[1].vector), "Empty train not empty")
+        detectors = p.NetCons(stims, None)
+        recs = [nc.record() for nc in detectors]
+        del stims
+        gc.collect()
+        p.finitialize()
+        p.continuerun(10)
+        self.assertEqual([[1, 5], [], [2, 3, 4]], [list(r) for r in recs])
+        with self.assertRaises(ValueError):
+            p.VecStims([1, 2], [0, 3])
+        with self.assertRaises(ValueError):
+            p.VecStims([1, 2], [1, 0, 2])
+
+    @unittest.skipIf(
+        p.parallel.nhost() != 1, "Avoid NEURON throwing MPI_ABORTs for HOC errors"
+    )
+    def test_bulk_netcons_error(self):
+        from patch.exceptions import HocConnectError
+
+        with self.assertRaises(HocConnectError):
+            p.NetCons([p.NetStim()], [p.Vector()])
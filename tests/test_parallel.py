@@ -50,6 +50,8 @@ class TestSingleHostParallel(_shared.NeuronTestCase):
         self.assertEqual([1, 2, 3], list(v), "single node vector broadcast failed")
         with self.assertRaises(BroadcastError):
             p.parallel.broadcast(p.NetStim())
+        data = bytes(range(256)) * 1001 + b"odd"
+        self.assertEqual(data, p.parallel.broadcast(data), "Bytes mangled")
 
 
 @unittest.skipIf(
@@ -86,6 +88,52 @@ class TestParallelNetworks(_shared.NeuronTestCase):
         self.assertRaises(BroadcastError, p.parallel.broadcast, p.NetStim())
         self.assertRaises(BroadcastError, p.parallel.broadcast, p.Section())
 
+    def test_large_broadcast(self):
+        import pickle
+
+        import patch.interpreter
+
+        data = bytes(range(256)) * 100_001
+        self.assertGreater(len(data), patch.interpreter._BROADCAST_CHUNK)
+        x = p.parallel.broadcast(data if p.parallel.id() == 0 else None)
+        self.assertEqual(data, x, "Large payload mangled")
+        # Test the HOC Vector transport, regardless of mpi4py
+        payload = pickle.dumps(data) if p.parallel.id() == 1 else None
+        x = p.parallel._broadcast_bytes_hoc(payload, 1)
+        self.assertEqual(data, pickle.loads(x), "Large payload mangled over HOC")
+
+
+class TestPopulations(_shared.NeuronTestCase):
+    def test_population_connections(self):
+        import numpy as np
+
+        pc = p.parallel
+        gids = 4040 + pc.id() * 3 + np.arange(3)
+        sections = [p.Section() for _ in range(3)]
+        for section in sections:
+            section.synapse(p.ExpSyn, attributes={"tau": 2}).stimulate(
+                start=0, number=1, interval=10, weight=1, delay=1
+            )
+        detectors = pc.register_cells(gids, sections, threshold=-52)
+        self.assertEqual(3, len(detectors), "Expected 3 detectors")
+        self.assertEqual(list(gids), list(detectors.gids), "GIDs not stored")
+        self.assertEqual([-52] * 3, list(detectors.threshold), "Threshold not set")
+        # Every node receives the first cell of every node.
+        pre_gids = 4040 + np.arange(pc.nhost()) * 3
+        targets = [p.Section().synapse(p.ExpSyn) for _ in pre_gids]
+        received = pc.connect_gids(pre_gids, targets, weight=0.04, delay=2)
+        self.assertEqual(list(pre_gids), list(received.gids), "GIDs not stored")
+        self.assertEqual([2] * len(targets), list(received.delay), "Delay not set")
+        with self.assertRaises(RuntimeError):
+            received.threshold = -20
+        with self.assertRaises(ValueError):
+            pc.connect_gids(pre_gids, targets[:1] * (len(targets) + 1))
+        g = [p.Vector().record(target._ref_g) for target in targets]
+        p.finitialize()
+        pc.psolve(20)
+        for vector in g:
+            self.assertGreater(max(vector), 0, "Spikes not received")
+
 
 class TestParallelPointProcess(_shared.NeuronTestCase):
     def _setup_synapse_parallel(self):
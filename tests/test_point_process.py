@@ -52,3 +52,14 @@ class TestPointProcess(_shared.NeuronTestCase):
         self.assertIs(
             patch.objects.PointerWrapper, type(type(syn).e), "Wrapper set broke wrapper"
         )
+
+    def test_wrapper_values(self):
+        section = p.Section()
+        syn = section.synapse(p.ExpSyn)
+        syn2 = section.synapse(p.ExpSyn)
+        self.assertIs(type(syn.e), type(syn2.e), "Value types should be cached")
+        self.assertIn("pointer to hoc scalar", str(syn.e.__record__()), "no __record__")
+        self.assertIn("e=0.0 at t=", repr(syn.e), "Unexpected repr")
+        syn2.raw_values = True
+        self.assertIs(float, type(syn2.e), "Raw value mode should return floats")
+        self.assertIsNot(float, type(syn.e), "Raw value mode should be per object")
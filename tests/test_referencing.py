@@ -69,4 +69,20 @@ class TestReferencing(_shared.NeuronTestCase):
         gc.collect()
         self.assertIsNotNone(r(), "ParallelCon got garbage collected")
 
+    def test_ref_many(self):
+        from patch.objects import Section, reference_graph
+
+        s = p.Section()
+        others = [p.Section() for _ in range(10)]
+        s.__ref_many__(others)
+        s.__ref_many__(others)
+        self.assertEqual(10, len(s._references), "Referencing failure: added twice.")
+        rewrapped = Section(p, others[0].__neuron__())
+        self.assertTrue(s.__deref__(rewrapped), "Dereferencing by equal wrapper failed.")
+        self.assertEqual(9, s.__deref_many__(others), "Bulk dereferencing failure.")
+        self.assertEqual(0, len(s._references), "Bulk dereferencing failure.")
+        syn = s.synapse(p.ExpSyn)
+        self.assertIn((s, syn), reference_graph(s), "Reference graph missing edge.")
+        self.assertIn((syn, s), reference_graph(s), "Reference graph missing edge.")
+
     # TODO: Test Synapses, point processes, NetStim & NetCon
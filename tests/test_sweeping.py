@@ -0,0 +1,65 @@
+import unittest
+
+import _shared
+
+import patch.sweeping
+from patch import output, p, sweep
+
+
+def _build():
+    soma = p.Section()
+    soma.insert("hh")
+    clamp = soma.iclamp(amplitude=0, delay=5, duration=100)
+    output(soma.record(), "v")
+    return {"soma": soma, "clamp": clamp}
+
+
+@unittest.skipIf(p.parallel.nhost() != 1, "Sweeps can't be forked from MPI processes.")
+class TestSweep(_shared.NeuronTestCase):
+    """
+    Test parameter sweeps over a model built once.
+    """
+
+    def test_sweep(self):
+        params = [{"clamp.amp": amp, "soma.gnabar_hh": 0.1} for amp in (0, 5, 10, 20)]
+        forked = dict(sweep(_build, params, duration=20, workers=2))
+        serial = dict(sweep(_build, params, duration=20, workers=1))
+        self.assertEqual([0, 1, 2, 3], sorted(forked), "Missing results")
+        for i in range(4):
+            self.assertEqual(
+                list(serial[i]["v"]), list(forked[i]["v"]), "Forked results differ"
+            )
+        peaks = [serial[i]["v"].max() for i in range(4)]
+        self.assertEqual(sorted(peaks), peaks, "Parameters not applied")
+        self.assertLess(peaks[0], peaks[-1], "Parameters not applied")
+
+    def test_release(self):
+        params = [{"clamp.amp": amp} for amp in (0, 5, 10, 20)]
+        results = sweep(_build, params, duration=5, workers=2)
+        self.assertFalse(patch.sweeping._sweep, "Model stored before iteration")
+        self.assertFalse(patch.sweeping._outputs, "Outputs kept")
+        next(results)
+        self.assertFalse(patch.sweeping._sweep, "Model kept after forking")
+        results.close()
+        results = sweep(_build, params, duration=5, workers=1)
+        next(results)
+        self.assertIn("model", patch.sweeping._sweep, "Model not available to task")
+        results.close()
+        self.assertFalse(patch.sweeping._sweep, "Model kept after closing")
+
+    def test_restore(self):
+        model = _build()
+        params = [{"soma.gnabar_hh": 0.5}]
+        list(sweep(lambda: model, params, duration=1, workers=1))
+        self.assertAlmostEqual(0.12, model["soma"](0.5).gnabar_hh, msg="Not restored")
+        applied = []
+        list(
+            sweep(
+                lambda: model,
+                params,
+                duration=1,
+                workers=1,
+                apply=lambda m, ps: applied.append(ps),
+            )
+        )
+        self.assertEqual(params, applied, "Custom apply not called")
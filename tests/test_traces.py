@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+import _shared
+
+from patch import p
+from patch.traces import Traces
+
+
+class TestTraces(_shared.NeuronTestCase):
+    """
+    Test streaming recordings to disk.
+    """
+
+    def _setup(self):
+        s = p.Section()
+        s.insert("hh")
+        s.iclamp(amplitude=0.3, delay=5, duration=100)
+        return s
+
+    def test_stream(self):
+        import numpy as np
+
+        s = self._setup()
+        reference = s.record()
+        p.finitialize(-65)
+        p.continuerun(50)
+        reference = reference.as_numpy().copy()
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "traces.dat")
+            v = p.record(s(0.5))
+            dt = p.Vector().record(s(0.5)._ref_v, 1)
+            with p.record_to_disk(path, {"v": v, "decimated": dt}, chunk=7) as sink:
+                p.finitialize(-65)
+                p.continuerun(20)
+                self.assertLess(len(v), 7 / p.dt + 2, "Vector not flushed")
+                p.run(50, reset=False)
+            self.assertFalse(p._chunk_hooks, "Sink hook not removed")
+            traces = sink.close()
+            self.assertEqual(["v", "decimated"], traces.keys())
+            self.assertTrue(np.array_equal(reference, traces["v"]), "Trace mangled")
+            self.assertAlmostEqual(50, traces.time[-1])
+            self.assertEqual(len(reference), len(traces.time), "Time mangled")
+            self.assertEqual(51, len(traces["decimated"]), "Decimated trace mangled")
+            t, w = traces.window("v", 10, 20)
+            self.assertTrue(np.all((t >= 10) & (t < 20)), "Samples outside window")
+            mask = (traces.time >= 10) & (traces.time < 20)
+            self.assertTrue(np.array_equal(reference[mask], w), "Wrong window")
+            with self.assertRaises(ValueError):
+                traces.window("decimated", 10, 20)
+            with self.assertRaises(KeyError):
+                traces["w"]
+            self.assertEqual(traces.keys(), Traces(path).keys(), "Index not stored")